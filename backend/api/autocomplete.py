@@ -0,0 +1,65 @@
+"""Индекс для автодополнения ингредиентов."""
+from bisect import bisect_left, bisect_right
+
+from api.versions import INGREDIENTS_VERSION, VersionedCache
+from recipes.models import Ingredient
+
+SEPARATOR = '\n'
+
+
+class IngredientIndex(VersionedCache):
+    """
+    Индекс названий ингредиентов в памяти процесса.
+
+    Названия приводятся к casefold, сортируются и склеиваются в одну
+    строку: префиксный поиск идёт бинарным поиском по списку ключей,
+    поиск подстроки - через str.find по склеенной строке.
+    Индекс строится при первом обращении и перестраивается, когда
+    меняется общая версия ингредиентов (её меняют сигналы и команда
+    import_ingredients) или индекс старше INGREDIENT_CACHE_TTL секунд.
+    """
+    version_name = INGREDIENTS_VERSION
+
+    def _build(self):
+        entries = sorted(
+            (name.casefold(), pk, name, measurement_unit)
+            for pk, name, measurement_unit in Ingredient.objects.values_list(
+                'id', 'name', 'measurement_unit'
+            ).order_by()
+        )
+        keys = [entry[0] for entry in entries]
+        rows = [
+            {'id': pk, 'name': name, 'measurement_unit': measurement_unit}
+            for _, pk, name, measurement_unit in entries
+        ]
+        offsets = []
+        position = 0
+        for key in keys:
+            offsets.append(position)
+            position += len(key) + len(SEPARATOR)
+        return keys, rows, offsets, SEPARATOR.join(keys)
+
+    def search(self, query, limit):
+        """Сначала совпадения по началу названия, затем по подстроке."""
+        query = query.casefold().strip()
+        keys, rows, offsets, haystack = self.get_value()
+        if not query or SEPARATOR in query:
+            return rows[:limit]
+        start = bisect_left(keys, query)
+        end = start
+        while (end < len(keys) and end - start < limit
+               and keys[end].startswith(query)):
+            end += 1
+        result = rows[start:end]
+        position = haystack.find(query)
+        while position != -1 and len(result) < limit:
+            number = bisect_right(offsets, position) - 1
+            if offsets[number] != position:
+                result.append(rows[number])
+            if number + 1 == len(offsets):
+                break
+            position = haystack.find(query, offsets[number + 1])
+        return result
+
+
+ingredient_index = IngredientIndex()
@@ -0,0 +1,105 @@
+"""Кэш ответов для анонимных запросов к рецептам."""
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import caches
+from django.db import transaction
+from rest_framework.response import Response
+
+VERSION_KEY = 'recipe-responses:version'
+STATS_KEYS = {
+    'hits': 'recipe-responses:hits',
+    'misses': 'recipe-responses:misses',
+}
+# Бэкенды, данные которых видны только своему процессу.
+LOCAL_BACKENDS = ('LocMemCache', 'DummyCache')
+
+
+class ResponseCache:
+    """
+    Кэш данных ответа по нормализованным параметрам запроса.
+
+    Работает с любым бэкендом Django (locmem по умолчанию, Redis
+    через CACHES). Ключи содержат номер версии, поэтому сброс всех
+    записей - это смена версии после коммита транзакции.
+
+    Счётчики попаданий хранятся в том же кэше. С locmem они свои у
+    каждого процесса: смотреть их нужно через /api/cache-stats/ того же
+    веб-процесса, а команда response_cache_stats видит общие счётчики
+    только с общим бэкендом (Redis, Memcached).
+    """
+
+    def __init__(self, alias):
+        self.alias = alias
+
+    @property
+    def cache(self):
+        return caches[self.alias]
+
+    def get_version(self):
+        self.cache.add(VERSION_KEY, uuid4().hex, None)
+        return self.cache.get(VERSION_KEY)
+
+    def invalidate(self):
+        transaction.on_commit(
+            lambda: self.cache.set(VERSION_KEY, uuid4().hex, None)
+        )
+
+    def make_key(self, request):
+        params = urlencode(sorted(
+            (key, value)
+            for key, values in request.query_params.lists()
+            for value in values
+            if value
+        ))
+        return (f'recipe-responses:{self.get_version()}:'
+                f'{request.get_host()}{request.path}?{params}')
+
+    def is_shared(self):
+        return type(self.cache).__name__ not in LOCAL_BACKENDS
+
+    def count(self, name):
+        key = STATS_KEYS[name]
+        self.cache.add(key, 0, None)
+        try:
+            self.cache.incr(key)
+        except ValueError:
+            self.cache.set(key, 1, None)
+
+    def stats(self):
+        values = self.cache.get_many(STATS_KEYS.values())
+        return {name: values.get(key, 0) for name, key in STATS_KEYS.items()}
+
+    def reset_stats(self):
+        self.cache.delete_many(STATS_KEYS.values())
+
+
+response_cache = ResponseCache(settings.RESPONSE_CACHE_ALIAS)
+
+
+class AnonymousCacheMixin:
+    """Кэширует list и retrieve для анонимных пользователей."""
+
+    def cached(self, handler, request, *args, **kwargs):
+        if not request.user.is_anonymous:
+            return handler(request, *args, **kwargs)
+        key = response_cache.make_key(request)
+        data = response_cache.cache.get(key)
+        if data is not None:
+            response_cache.count('hits')
+            return Response(data, headers={'X-Cache': 'HIT'})
+        response_cache.count('misses')
+        response = handler(request, *args, **kwargs)
+        if response.status_code == 200:
+            response_cache.cache.set(
+                key, response.data, settings.RESPONSE_CACHE_TIMEOUT
+            )
+        response['X-Cache'] = 'MISS'
+        return response
+
+    def list(self, request, *args, **kwargs):
+        return self.cached(super().list, request, *args, **kwargs)
+
+    def retrieve(self, request, *args, **kwargs):
+        return self.cached(super().retrieve, request, *args, **kwargs)
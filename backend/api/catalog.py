@@ -0,0 +1,57 @@
+"""Готовый JSON со всеми ингредиентами."""
+import gzip
+import os
+from hashlib import md5
+from time import time
+
+from django.conf import settings
+from rest_framework.renderers import JSONRenderer
+
+from api.versions import INGREDIENTS_VERSION, VersionedCache
+from recipes.models import Ingredient
+
+CATALOG_FILENAME = 'ingredients.json.gz'
+
+
+class IngredientCatalog:
+    """Снимок справочника ингредиентов: JSON, его gzip и ETag."""
+
+    def __init__(self, rows):
+        self.payload = JSONRenderer().render(rows)
+        self.compressed = gzip.compress(self.payload, mtime=0)
+        digest = md5(self.payload).hexdigest()
+        self.etag = f'"{digest}"'
+        self.compressed_etag = f'"{digest}-gzip"'
+        self.last_modified = int(time())
+
+
+class IngredientCatalogCache(VersionedCache):
+    """
+    Справочник ингредиентов, сериализованный один раз.
+
+    Строится при первом запросе полного списка и перестраивается по
+    той же общей версии ингредиентов, что и индекс автодополнения,
+    в том числе после import_ingredients в другом процессе. Если задан
+    INGREDIENT_CATALOG_DIR, сжатый файл сохраняется и на диск, откуда
+    его может отдавать nginx.
+    """
+    version_name = INGREDIENTS_VERSION
+
+    def _build(self):
+        catalog = IngredientCatalog(list(
+            Ingredient.objects.values('id', 'name', 'measurement_unit')
+        ))
+        directory = settings.INGREDIENT_CATALOG_DIR
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            path = os.path.join(directory, CATALOG_FILENAME)
+            with open(f'{path}.tmp', 'wb') as file:
+                file.write(catalog.compressed)
+            os.replace(f'{path}.tmp', path)
+        return catalog
+
+    def get(self):
+        return self.get_value()
+
+
+ingredient_catalog = IngredientCatalogCache()
@@ -0,0 +1,110 @@
+"""Подсчёт количества рецептов для постраничного вывода."""
+import json
+from hashlib import md5
+from urllib.parse import urlencode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import connections
+from django.utils.functional import cached_property
+
+COUNT_VERSION_KEY = 'recipe-count-version'
+# Параметры, от которых количество не зависит.
+IGNORED_PARAMS = ('page', 'limit', 'cursor', 'ordering')
+# Фильтры, результат которых свой у каждого пользователя.
+USER_PARAMS = ('is_favorited', 'is_in_shopping_cart')
+
+
+def get_version_key(user_id=None):
+    if user_id is None:
+        return COUNT_VERSION_KEY
+    return f'{COUNT_VERSION_KEY}:{user_id}'
+
+
+def get_count_version(user_id=None):
+    key = get_version_key(user_id)
+    version = cache.get(key)
+    if version is None:
+        version = uuid4().hex
+        cache.set(key, version, None)
+    return version
+
+
+def invalidate_counts(user_id=None):
+    """
+    Сбрасывает кэш количества рецептов.
+
+    Без user_id сбрасываются все количества, с user_id - только
+    количества по избранному и списку покупок этого пользователя.
+    """
+    cache.set(get_version_key(user_id), uuid4().hex, None)
+
+
+def get_count_key(request):
+    """
+    Ключ количества по параметрам фильтрации запроса.
+
+    id пользователя и версия его количеств добавляются, только если
+    запрос фильтрует по избранному или списку покупок.
+    """
+    params = sorted(
+        (name, value)
+        for name, values in request.query_params.lists()
+        if name not in IGNORED_PARAMS
+        for value in values
+        if value
+    )
+    version = get_count_version()
+    user = request.user
+    if user.is_authenticated and any(
+        name in USER_PARAMS for name, _ in params
+    ):
+        version = f'{version}:{user.id}:{get_count_version(user.id)}'
+    digest = md5(urlencode(params).encode()).hexdigest()
+    return f'recipe-count:{version}:{digest}'
+
+
+def estimate_count(queryset):
+    """Оценка числа строк планировщиком PostgreSQL или None."""
+    connection = connections[queryset.db]
+    if connection.vendor != 'postgresql':
+        return None
+    sql, params = queryset.query.sql_with_params()
+    with connection.cursor() as cursor:
+        cursor.execute(f'EXPLAIN (FORMAT JSON) {sql}', params)
+        plan = cursor.fetchone()[0]
+    if isinstance(plan, str):
+        plan = json.loads(plan)
+    return int(plan[0]['Plan']['Plan Rows'])
+
+
+class CachedCountPaginator(Paginator):
+    """
+    Paginator с кэшированным COUNT(*).
+
+    Точное количество кэшируется по ключу cache_key (см. get_count_key)
+    на RECIPES_COUNT_CACHE_TIMEOUT секунд и сбрасывается при создании
+    и удалении рецептов, а для фильтров по избранному и списку покупок -
+    при их изменении. Если оценка планировщика больше
+    RECIPES_COUNT_ESTIMATE_THRESHOLD, отдаётся оценка без подсчёта.
+    """
+
+    def __init__(self, *args, cache_key, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.cache_key = cache_key
+
+    @cached_property
+    def count(self):
+        key = self.cache_key
+        count = cache.get(key)
+        if count is not None:
+            return count
+        threshold = settings.RECIPES_COUNT_ESTIMATE_THRESHOLD
+        if threshold is not None:
+            count = estimate_count(self.object_list)
+        if count is None or count < threshold:
+            count = self.object_list.count()
+        cache.set(key, count, settings.RECIPES_COUNT_CACHE_TIMEOUT)
+        return count
@@ -0,0 +1,104 @@
+"""Форматы выгрузки списка покупок."""
+import csv
+import json
+
+from django.http import StreamingHttpResponse
+from rest_framework.renderers import BaseRenderer
+
+from api.pdf import shopping_list_renderer
+
+
+class _Echo:
+    """Псевдобуфер для csv.writer, возвращающий записанную строку."""
+
+    def write(self, value):
+        return value
+
+
+class ShoppingListExporter(BaseRenderer):
+    """
+    Базовый формат выгрузки списка покупок.
+
+    Формат выбирается стандартным согласованием содержимого DRF
+    по параметру ?format= или заголовку Accept. Сам список отдаёт
+    метод response() наследника, а render() используется DRF только
+    для ответов с ошибками.
+    """
+    charset = 'utf-8'
+
+    @property
+    def filename(self):
+        return f'shopping_list.{self.format}'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        response = (renderer_context or {}).get('response')
+        if response is not None:
+            response['Content-Type'] = 'text/plain; charset=utf-8'
+        if isinstance(data, dict):
+            data = '\n'.join(f'{key}: {value}' for key, value in data.items())
+        return str(data).encode('utf-8')
+
+
+class StreamingExporter(ShoppingListExporter):
+    """Текстовый формат, который отдаётся потоком строк из lines()."""
+
+    def response(self, ingredients):
+        response = StreamingHttpResponse(
+            self.lines(ingredients),
+            content_type=f'{self.media_type}; charset={self.charset}',
+        )
+        response['Content-Disposition'] = (
+            f'attachment; filename="{self.filename}"'
+        )
+        return response
+
+
+class PDFExporter(ShoppingListExporter):
+    media_type = 'application/pdf'
+    format = 'pdf'
+    charset = None
+
+    def response(self, ingredients):
+        return shopping_list_renderer.response(ingredients, self.filename)
+
+
+class CSVExporter(StreamingExporter):
+    media_type = 'text/csv'
+    format = 'csv'
+
+    def lines(self, ingredients):
+        writer = csv.writer(_Echo())
+        yield writer.writerow(('name', 'measurement_unit', 'amount'))
+        for item in ingredients:
+            yield writer.writerow((
+                item['name'], item['measurement_unit'], item['amount']
+            ))
+
+
+class TextExporter(StreamingExporter):
+    media_type = 'text/plain'
+    format = 'txt'
+
+    def lines(self, ingredients):
+        yield 'Список ингредиентов\n'
+        for i, item in enumerate(ingredients, 1):
+            yield (f'{i}. {item["name"]} - {item["amount"]}, '
+                   f'{item["measurement_unit"]}\n')
+
+
+class JSONExporter(StreamingExporter):
+    media_type = 'application/json'
+    format = 'json'
+
+    def render(self, data, accepted_media_type=None, renderer_context=None):
+        return json.dumps(data, ensure_ascii=False).encode('utf-8')
+
+    def lines(self, ingredients):
+        yield '['
+        for i, item in enumerate(ingredients):
+            yield (',' if i else '') + json.dumps(item, ensure_ascii=False)
+        yield ']'
+
+
+SHOPPING_LIST_EXPORTERS = (PDFExporter, CSVExporter, TextExporter,
+                           JSONExporter)
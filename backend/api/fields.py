@@ -0,0 +1,101 @@
+"""Поля сериализаторов."""
+import re
+from base64 import b64decode
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.files.uploadedfile import TemporaryUploadedFile
+from PIL import Image
+from rest_framework import serializers
+
+DATA_URL = re.compile(r'^data:(?P<content_type>[\w.+/-]+);base64,')
+# Длина кусков кратна 4, чтобы каждый декодировался отдельно.
+CHUNK_SIZE = 64 * 1024 * 4
+SIGNATURES = (
+    (b'\x89PNG\r\n\x1a\n', 'image/png', 'png'),
+    (b'\xff\xd8\xff', 'image/jpeg', 'jpg'),
+    (b'GIF87a', 'image/gif', 'gif'),
+    (b'GIF89a', 'image/gif', 'gif'),
+)
+
+
+def detect_image(head):
+    """Определяет формат картинки по первым байтам."""
+    if head[:4] == b'RIFF' and head[8:12] == b'WEBP':
+        return 'image/webp', 'webp'
+    for signature, content_type, extension in SIGNATURES:
+        if head.startswith(signature):
+            return content_type, extension
+    return None
+
+
+class Base64ImageField(serializers.ImageField):
+    """
+    Картинка в base64, декодируемая по частям во временный файл.
+
+    Заголовок data URL и размер проверяются до декодирования, формат -
+    по сигнатуре первого куска, поэтому неподходящие данные
+    отклоняются сразу, а в памяти не держится декодированная копия
+    всей картинки.
+    """
+    default_error_messages = {
+        'invalid': 'Картинка должна быть строкой base64.',
+        'invalid_type': 'Недопустимый тип картинки: {content_type}.',
+        'max_size': 'Размер картинки больше {max_size} байт.',
+        'invalid_image': 'Загруженный файл не является картинкой.',
+    }
+
+    def to_internal_value(self, data):
+        if not isinstance(data, str):
+            self.fail('invalid')
+        start = 0
+        header = DATA_URL.match(data)
+        if header:
+            content_type = header.group('content_type')
+            if content_type not in settings.RECIPE_IMAGE_CONTENT_TYPES:
+                self.fail('invalid_type', content_type=content_type)
+            start = header.end()
+        max_size = settings.RECIPE_IMAGE_MAX_SIZE
+        if (len(data) - start) // 4 * 3 > max_size + 2:
+            self.fail('max_size', max_size=max_size)
+        upload = TemporaryUploadedFile('image', None, 0, None)
+        try:
+            self.decode(data, start, upload)
+        except serializers.ValidationError:
+            upload.close()
+            raise
+        return upload
+
+    def decode(self, data, start, upload):
+        size = 0
+        for offset in range(start, len(data), CHUNK_SIZE):
+            try:
+                chunk = b64decode(
+                    data[offset:offset + CHUNK_SIZE], validate=True
+                )
+            except ValueError:
+                self.fail('invalid')
+            if not size:
+                detected = detect_image(chunk)
+                if detected is None:
+                    self.fail('invalid_image')
+                upload.content_type, extension = detected
+            size += len(chunk)
+            if size > settings.RECIPE_IMAGE_MAX_SIZE:
+                self.fail('max_size', max_size=settings.RECIPE_IMAGE_MAX_SIZE)
+            upload.write(chunk)
+        if not size:
+            self.fail('invalid_image')
+        upload.size = size
+        upload.name = f'{uuid4()}.{extension}'
+        upload.seek(0)
+        # Плагины Pillow на битом заголовке бросают не только
+        # UnidentifiedImageError (подкласс OSError), но и SyntaxError,
+        # ValueError и другие OSError.
+        try:
+            with Image.open(upload):
+                pass
+        except (OSError, SyntaxError, ValueError,
+                Image.DecompressionBombError):
+            self.fail('invalid_image')
+        upload.seek(0)
@@ -1,19 +1,19 @@
+from django.db.models import Exists, OuterRef
 from django_filters.rest_framework import FilterSet, filters
-from rest_framework.filters import SearchFilter
 
-from recipes.models import Recipe, Tag
+from api.registry import tag_registry
+from recipes.models import Recipe, RecipeTag
 from users.models import User
 
 
-class IngredientSearchFilter(SearchFilter):
-    search_param = 'name'
+def get_tag_choices():
+    return tag_registry.choices()
 
 
 class RecipesFilter(FilterSet):
-    tags = filters.ModelMultipleChoiceFilter(
-        queryset=Tag.objects.all(),
-        field_name='tags__slug',
-        to_field_name='slug',
+    tags = filters.MultipleChoiceFilter(
+        choices=get_tag_choices,
+        method='get_tags',
     )
     author = filters.ModelChoiceFilter(
         queryset=User.objects.all()
@@ -24,19 +24,35 @@ class RecipesFilter(FilterSet):
     is_in_shopping_cart = filters.BooleanFilter(
         method='get_is_in_shopping_cart',
     )
+    ordering = filters.ChoiceFilter(
+        choices=(('popular', 'popular'),),
+        method='get_ordering',
+    )
 
     class Meta:
         model = Recipe
-        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart')
+        fields = ('tags', 'author', 'is_favorited', 'is_in_shopping_cart',
+                  'ordering')
+
+    def get_tags(self, queryset, name, value):
+        return queryset.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'),
+            tag_id__in=tag_registry.ids_for_slugs(value),
+        )))
 
     def get_is_favorited(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(favorite_recipe__user=user)
+            return queryset.filter(is_favorited=True)
         return queryset
 
     def get_is_in_shopping_cart(self, queryset, name, value):
         user = self.request.user
         if value and user.is_authenticated:
-            return queryset.filter(shoppingcart_recipe__user=user)
+            return queryset.filter(is_in_shopping_cart=True)
+        return queryset
+
+    def get_ordering(self, queryset, name, value):
+        if value == 'popular':
+            return queryset.order_by('-favorites_count', '-pub_date')
         return queryset
@@ -0,0 +1,28 @@
+from django.core.management.base import BaseCommand
+
+from api.cache import response_cache
+
+
+class Command(BaseCommand):
+    help = 'Show hit and miss counters of the recipe response cache'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--reset', action='store_true',
+                            help='Reset counters after printing')
+
+    def handle(self, *args, **options):
+        if not response_cache.is_shared():
+            self.stderr.write(self.style.WARNING(
+                'The response cache backend is local to each process, '
+                'so these counters cover only this command. Configure a '
+                'shared cache or use /api/cache-stats/ instead.'
+            ))
+        stats = response_cache.stats()
+        total = stats['hits'] + stats['misses']
+        ratio = stats['hits'] / total * 100 if total else 0
+        self.stdout.write(
+            f'hits: {stats["hits"]}, misses: {stats["misses"]}, '
+            f'hit ratio: {ratio:.1f}%'
+        )
+        if options['reset']:
+            response_cache.reset_stats()
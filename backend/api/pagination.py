@@ -1,6 +1,118 @@
-from rest_framework.pagination import PageNumberPagination
+from base64 import urlsafe_b64decode, urlsafe_b64encode
+from collections import OrderedDict
+from functools import partial
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination, PageNumberPagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+
+from api.counting import CachedCountPaginator, get_count_key
 
 
 class CustomPagination(PageNumberPagination):
     page_size = 6
     page_size_query_param = 'limit'
+
+
+class KeysetPagination(BasePagination):
+    """
+    Постраничный вывод по курсору (pub_date, id).
+
+    Вместо OFFSET и COUNT(*) следующая страница выбирается условием
+    (pub_date, id) < (pub_date, id) последнего элемента, поэтому время
+    ответа не зависит от глубины прокрутки.
+    """
+    page_size = CustomPagination.page_size
+    page_size_query_param = 'limit'
+    cursor_query_param = 'cursor'
+    invalid_cursor_message = 'Неверный курсор'
+
+    def get_page_size(self, request):
+        limit = request.query_params.get(self.page_size_query_param, '')
+        if limit.isdigit() and int(limit) > 0:
+            return int(limit)
+        return self.page_size
+
+    def encode_cursor(self, item):
+        value = f'{item.pub_date.isoformat()}|{item.pk}'
+        return urlsafe_b64encode(value.encode()).decode()
+
+    def decode_cursor(self, request):
+        cursor = request.query_params.get(self.cursor_query_param)
+        if not cursor:
+            return None
+        try:
+            pub_date, pk = urlsafe_b64decode(
+                cursor.encode()
+            ).decode().split('|')
+            pub_date, pk = parse_datetime(pub_date), int(pk)
+        except (TypeError, ValueError):
+            raise NotFound(self.invalid_cursor_message)
+        if pub_date is None:
+            raise NotFound(self.invalid_cursor_message)
+        return pub_date, pk
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        page_size = self.get_page_size(request)
+        cursor = self.decode_cursor(request)
+        queryset = queryset.order_by('-pub_date', '-id')
+        if cursor is not None:
+            pub_date, pk = cursor
+            # Условие pub_date <= ... избыточно, но без него OR не
+            # становится границей индекса и база перебирает все более
+            # новые рецепты.
+            queryset = queryset.filter(
+                Q(pub_date__lt=pub_date) | Q(pub_date=pub_date, id__lt=pk),
+                pub_date__lte=pub_date,
+            )
+        page = list(queryset[:page_size + 1])
+        self.next_item = page[page_size - 1] if len(page) > page_size else None
+        return page[:page_size]
+
+    def get_next_link(self):
+        if self.next_item is None:
+            return None
+        return replace_query_param(
+            self.request.build_absolute_uri(),
+            self.cursor_query_param,
+            self.encode_cursor(self.next_item),
+        )
+
+    def get_paginated_response(self, data):
+        return Response(OrderedDict([
+            ('next', self.get_next_link()),
+            ('results', data),
+        ]))
+
+
+class RecipePagination(CustomPagination):
+    """
+    Номера страниц по умолчанию и курсор по запросу клиента.
+
+    Курсорный режим включается параметром cursor (пустым для первой
+    страницы) и работает только с сортировкой по дате публикации.
+    В режиме номеров страниц количество берётся из CachedCountPaginator
+    с ключом по параметрам фильтрации запроса.
+    """
+    keyset_pagination_class = KeysetPagination
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.keyset = None
+        if (self.keyset_pagination_class.cursor_query_param
+                in request.query_params
+                and not request.query_params.get('ordering')):
+            self.keyset = self.keyset_pagination_class()
+            return self.keyset.paginate_queryset(queryset, request, view)
+        self.django_paginator_class = partial(
+            CachedCountPaginator, cache_key=get_count_key(request)
+        )
+        return super().paginate_queryset(queryset, request, view)
+
+    def get_paginated_response(self, data):
+        if self.keyset is not None:
+            return self.keyset.get_paginated_response(data)
+        return super().get_paginated_response(data)
@@ -0,0 +1,70 @@
+"""Справочник тэгов в памяти процесса."""
+from hashlib import md5
+
+from rest_framework.renderers import JSONRenderer
+
+from api.versions import TAGS_VERSION, VersionedCache
+from recipes.models import Tag
+
+
+class TagCatalog:
+    """Снимок всех тэгов с готовым JSON для /api/tags/."""
+
+    def __init__(self, tags):
+        from api.serializers import TagSerializer
+
+        self.by_slug = {tag.slug: tag for tag in tags}
+        data = TagSerializer(tags, many=True).data
+        self.by_id = {item['id']: dict(item) for item in data}
+        self.position = {tag_id: i for i, tag_id in enumerate(self.by_id)}
+        self.payload = JSONRenderer().render(data)
+        self.etag = f'"{md5(self.payload).hexdigest()}"'
+
+
+class TagRegistry(VersionedCache):
+    """
+    Все тэги, загруженные одним запросом.
+
+    Тэгов немного и меняются они редко, поэтому справочник вместе с
+    сериализованным списком строится при первом обращении и
+    перестраивается, когда сигналы меняют общую версию тэгов или
+    справочник старше TAG_CACHE_TTL секунд. Тэг рецепта, которого нет
+    в справочнике, значит, что справочник устарел: он перестраивается
+    сразу.
+    """
+    version_name = TAGS_VERSION
+    ttl_setting = 'TAG_CACHE_TTL'
+
+    def _build(self):
+        return TagCatalog(list(Tag.objects.all()))
+
+    def get_catalog(self):
+        return self.get_value()
+
+    def choices(self):
+        return [
+            (slug, tag.name)
+            for slug, tag in self.get_catalog().by_slug.items()
+        ]
+
+    def ids_for_slugs(self, slugs):
+        tags = self.get_catalog().by_slug
+        return [tags[slug].id for slug in slugs if slug in tags]
+
+    def get(self, tag_id):
+        return self.get_catalog().by_id.get(tag_id)
+
+    def serialize(self, tag_ids):
+        """Данные тэгов в порядке сортировки модели Tag."""
+        catalog = self.get_catalog()
+        if not catalog.by_id.keys() >= set(tag_ids):
+            with self._lock:
+                catalog = self._state[2] if self._state else None
+                if catalog is None or not catalog.by_id.keys() >= set(tag_ids):
+                    catalog = self.rebuild()
+        known = [tag_id for tag_id in tag_ids if tag_id in catalog.by_id]
+        known.sort(key=catalog.position.__getitem__)
+        return [catalog.by_id[tag_id] for tag_id in known]
+
+
+tag_registry = TagRegistry()
@@ -0,0 +1,83 @@
+"""Связи пользователя с рецептами и авторами."""
+from django.conf import settings
+from django.core.cache import caches
+
+from recipes.models import Favorite, ShoppingСart
+from users.models import Subscription
+
+RELATIONS = {
+    'favorites': (Favorite, 'recipe_id'),
+    'shopping_cart': (ShoppingСart, 'recipe_id'),
+    'subscriptions': (Subscription, 'author_id'),
+}
+
+
+def get_relations_cache():
+    alias = settings.USER_RELATIONS_CACHE
+    return caches[alias] if alias else None
+
+
+def get_cache_key(user_id, kind):
+    return f'user-relations:{user_id}:{kind}'
+
+
+def invalidate_user_relations(user_id, kind):
+    cache = get_relations_cache()
+    if cache is not None:
+        cache.delete(get_cache_key(user_id, kind))
+
+
+class UserRelations:
+    """
+    Множества id избранных рецептов, рецептов в корзине и авторов,
+    на которых подписан пользователь.
+
+    Каждое множество загружается одним запросом при первом обращении
+    и живёт до конца запроса. Если в USER_RELATIONS_CACHE указан
+    общий кэш, множества хранятся и в нём, а сигналы сбрасывают их
+    при изменении избранного, корзины и подписок.
+    """
+
+    def __init__(self, user):
+        self.user = user
+        self._sets = {}
+
+    def _load(self, kind):
+        if self.user.is_anonymous:
+            return frozenset()
+        cache = get_relations_cache()
+        key = get_cache_key(self.user.id, kind)
+        ids = cache.get(key) if cache is not None else None
+        if ids is None:
+            model, field = RELATIONS[kind]
+            ids = frozenset(
+                model.objects.filter(user=self.user).values_list(
+                    field, flat=True
+                )
+            )
+            if cache is not None:
+                cache.set(key, ids, settings.USER_RELATIONS_CACHE_TIMEOUT)
+        return ids
+
+    def _get(self, kind):
+        if kind not in self._sets:
+            self._sets[kind] = self._load(kind)
+        return self._sets[kind]
+
+    def is_favorited(self, recipe_id):
+        return recipe_id in self._get('favorites')
+
+    def is_in_shopping_cart(self, recipe_id):
+        return recipe_id in self._get('shopping_cart')
+
+    def is_subscribed(self, author_id):
+        return author_id in self._get('subscriptions')
+
+
+def get_user_relations(request):
+    """Возвращает связи пользователя, общие для всего запроса."""
+    relations = getattr(request, '_user_relations', None)
+    if relations is None:
+        relations = UserRelations(request.user)
+        request._user_relations = relations
+    return relations
@@ -1,13 +1,20 @@
-from django.shortcuts import get_object_or_404
+from operator import attrgetter
+
+from django.db import transaction
 from djoser.serializers import UserCreateSerializer, UserSerializer
-from drf_extra_fields.fields import Base64ImageField
 from rest_framework import serializers
 from rest_framework.validators import UniqueTogetherValidator
 
+from api.fields import Base64ImageField
+from api.registry import tag_registry
+from api.relations import get_user_relations
 from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
                             ShoppingСart, Tag)
+from recipes.tasks import image_queue
 from users.models import Subscription, User
 
+INGREDIENT_AMOUNT_FIELDS = ('id', 'name', 'measurement_unit', 'amount')
+
 
 class CustomUserSerializer(UserSerializer):
     is_subscribed = serializers.SerializerMethodField()
@@ -20,10 +27,11 @@ class CustomUserSerializer(UserSerializer):
         )
 
     def get_is_subscribed(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Subscription.objects.filter(user=user, author=obj.id).exists()
+        is_subscribed = getattr(obj, 'is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
+        request = self.context.get('request')
+        return get_user_relations(request).is_subscribed(obj.id)
 
 
 class CustomUserCreateSerializer(UserCreateSerializer):
@@ -58,7 +66,7 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
 
     class Meta:
         model = IngredientAmount
-        fields = ('id', 'name', 'measurement_unit', 'amount')
+        fields = INGREDIENT_AMOUNT_FIELDS
         validators = [
             UniqueTogetherValidator(
                 queryset=IngredientAmount.objects.all(),
@@ -68,7 +76,7 @@ class IngredientAmountSerializer(serializers.ModelSerializer):
 
 
 class RecipeReadSerializer(serializers.ModelSerializer):
-    tags = TagSerializer(many=True, read_only=True)
+    tags = serializers.SerializerMethodField()
     author = CustomUserSerializer(read_only=True)
     ingredients = IngredientAmountSerializer(
         source='ingredientamount_set',
@@ -90,24 +98,77 @@ class RecipeReadSerializer(serializers.ModelSerializer):
             'is_in_shopping_cart',
             'name',
             'image',
+            'image_status',
             'text',
             'cooking_time',
         )
 
+    author_fields = ('email', 'id', 'username', 'first_name', 'last_name')
+    author_values = attrgetter(*author_fields)
+    ingredient_values = attrgetter(
+        'ingredient.id', 'ingredient.name', 'ingredient.measurement_unit',
+        'amount'
+    )
+
+    def to_representation(self, instance):
+        """Собирает ответ напрямую, минуя поля DRF.
+
+        Результат совпадает с полями, объявленными выше: они остаются
+        для OPTIONS и документации.
+        """
+        author = dict(
+            zip(self.author_fields, self.author_values(instance.author))
+        )
+        author['is_subscribed'] = self.get_author_is_subscribed(instance)
+        return {
+            'id': instance.id,
+            'tags': self.get_tags(instance),
+            'author': author,
+            'ingredients': [
+                dict(zip(
+                    INGREDIENT_AMOUNT_FIELDS, self.ingredient_values(item)
+                ))
+                for item in instance.ingredientamount_set.all()
+            ],
+            'is_favorited': self.get_is_favorited(instance),
+            'is_in_shopping_cart': self.get_is_in_shopping_cart(instance),
+            'name': instance.name,
+            'image': self.get_image(instance),
+            'image_status': instance.image_status,
+            'text': instance.text,
+            'cooking_time': instance.cooking_time,
+        }
+
+    def get_author_is_subscribed(self, obj):
+        is_subscribed = getattr(obj, 'author_is_subscribed', None)
+        if is_subscribed is not None:
+            return is_subscribed
+        request = self.context.get('request')
+        return get_user_relations(request).is_subscribed(obj.author_id)
+
+    def get_tags(self, obj):
+        return tag_registry.serialize(
+            [item.tag_id for item in obj.recipetag_set.all()]
+        )
+
     def get_image(self, obj):
-        return obj.image.url
+        if self.parent is not None:
+            return obj.get_image_url('image_list')
+        return obj.get_image_url()
 
     def get_is_favorited(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return Favorite.objects.filter(user=user, recipe=obj).exists()
+        is_favorited = getattr(obj, 'is_favorited', None)
+        if is_favorited is not None:
+            return is_favorited
+        request = self.context.get('request')
+        return get_user_relations(request).is_favorited(obj.id)
 
     def get_is_in_shopping_cart(self, obj):
-        user = self.context.get('request').user
-        if user.is_anonymous:
-            return False
-        return ShoppingСart.objects.filter(user=user, recipe=obj).exists()
+        is_in_shopping_cart = getattr(obj, 'is_in_shopping_cart', None)
+        if is_in_shopping_cart is not None:
+            return is_in_shopping_cart
+        request = self.context.get('request')
+        return get_user_relations(request).is_in_shopping_cart(obj.id)
 
 
 class RecipeWriteSerializer(serializers.ModelSerializer):
@@ -133,62 +194,148 @@ class RecipeWriteSerializer(serializers.ModelSerializer):
             'cooking_time',
         )
 
+    def validate_ingredient_items(self, ingredients):
+        errors = []
+        amounts = {}
+        duplicates = set()
+        for ingredient_item in ingredients:
+            try:
+                ingredient_id = int(ingredient_item['id'])
+                amount = int(ingredient_item['amount'])
+            except (KeyError, TypeError, ValueError):
+                errors.append('У ингредиента должны быть id и количество')
+                continue
+            if ingredient_id in amounts:
+                duplicates.add(ingredient_id)
+            if amount < 1:
+                errors.append('Убедитесь, что значение количества '
+                              f'ингредиента {ingredient_id} больше 0')
+            amounts[ingredient_id] = amount
+        if duplicates:
+            errors.append('Ингридиенты должны быть уникальными: '
+                          f'{sorted(duplicates)}')
+        missing = amounts.keys() - set(
+            Ingredient.objects.filter(
+                id__in=amounts
+            ).values_list('id', flat=True)
+        )
+        if missing:
+            errors.append(f'Ингредиенты не найдены: {sorted(missing)}')
+        ingredients = [
+            {'id': ingredient_id, 'amount': amount}
+            for ingredient_id, amount in amounts.items()
+        ]
+        return ingredients, errors
+
+    def validate_tag_items(self, tags):
+        errors = []
+        try:
+            tag_ids = [int(tag) for tag in tags]
+        except (TypeError, ValueError):
+            return [], ['Теги должны быть заданы списком id']
+        if len(set(tag_ids)) != len(tag_ids):
+            errors.append('Теги должны быть уникальными')
+        missing = set(tag_ids) - set(
+            Tag.objects.filter(id__in=tag_ids).values_list('id', flat=True)
+        )
+        if missing:
+            errors.append(f'Теги не найдены: {sorted(missing)}')
+        return list(dict.fromkeys(tag_ids)), errors
+
     def validate(self, data):
+        errors = {}
         ingredients = self.initial_data.get('ingredients')
         if not ingredients:
-            raise serializers.ValidationError({
-                'ingredients': 'Нужен хоть один ингридиент для рецепта'})
-        ingredient_list = []
-        for ingredient_item in ingredients:
-            ingredient = get_object_or_404(Ingredient,
-                                           id=ingredient_item['id'])
-            if ingredient in ingredient_list:
-                raise serializers.ValidationError('Ингридиенты должны '
-                                                  'быть уникальными')
-            ingredient_list.append(ingredient)
-            if int(ingredient_item['amount']) < 0:
-                raise serializers.ValidationError({
-                    'ingredients': ('Убедитесь, что значение количества '
-                                    'ингредиента больше 0')
-                })
-        data['ingredients'] = ingredients
+            errors['ingredients'] = ['Нужен хоть один ингридиент для рецепта']
+        else:
+            data['ingredients'], ingredient_errors = (
+                self.validate_ingredient_items(ingredients)
+            )
+            if ingredient_errors:
+                errors['ingredients'] = ingredient_errors
+        tags = self.initial_data.get('tags')
+        if not tags:
+            errors['tags'] = ['Нужен хоть один тег для рецепта']
+        else:
+            data['tags'], tag_errors = self.validate_tag_items(tags)
+            if tag_errors:
+                errors['tags'] = tag_errors
+        if errors:
+            raise serializers.ValidationError(errors)
         return data
 
     def create_ingredients(self, ingredients, recipe):
-        for ingredient in ingredients:
-            IngredientAmount.objects.create(
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(
                 recipe=recipe,
                 ingredient_id=ingredient.get('id'),
                 amount=ingredient.get('amount'),
             )
+            for ingredient in ingredients
+        )
 
+    def update_ingredients(self, ingredients, recipe):
+        amounts = {
+            int(ingredient.get('id')): int(ingredient.get('amount'))
+            for ingredient in ingredients
+        }
+        current = {
+            item.ingredient_id: item
+            for item in IngredientAmount.objects.filter(recipe=recipe)
+        }
+        removed = current.keys() - amounts.keys()
+        if removed:
+            IngredientAmount.objects.filter(
+                recipe=recipe, ingredient_id__in=removed
+            ).delete()
+        changed = []
+        for ingredient_id, amount in amounts.items():
+            item = current.get(ingredient_id)
+            if item is not None and item.amount != amount:
+                item.amount = amount
+                changed.append(item)
+        if changed:
+            IngredientAmount.objects.bulk_update(changed, ('amount',))
+        self.create_ingredients(
+            [
+                {'id': ingredient_id, 'amount': amount}
+                for ingredient_id, amount in amounts.items()
+                if ingredient_id not in current
+            ],
+            recipe,
+        )
+
+    @transaction.atomic
     def create(self, validated_data):
         image = validated_data.pop('image')
         ingredients_data = validated_data.pop('ingredients')
-        recipe = Recipe.objects.create(image=image, **validated_data)
-        tags_data = self.initial_data.get('tags')
+        tags_data = validated_data.pop('tags')
+        recipe = Recipe.objects.create(**validated_data)
+        image_queue.enqueue(recipe, image)
         recipe.tags.set(tags_data)
         self.create_ingredients(ingredients_data, recipe)
         return recipe
 
+    @transaction.atomic
     def update(self, instance, validated_data):
-        instance.image = validated_data.get('image', instance.image)
+        if 'image' in validated_data:
+            image_queue.enqueue(instance, validated_data['image'])
         instance.name = validated_data.get('name', instance.name)
         instance.text = validated_data.get('text', instance.text)
         instance.cooking_time = validated_data.get(
             'cooking_time', instance.cooking_time
         )
-        instance.tags.clear()
-        tags_data = self.initial_data.get('tags')
-        instance.tags.set(tags_data)
-        IngredientAmount.objects.filter(recipe=instance).all().delete()
-        self.create_ingredients(validated_data.get('ingredients'), instance)
-        instance.save()
+        instance.tags.set(validated_data.get('tags'))
+        self.update_ingredients(validated_data.get('ingredients'), instance)
+        # Счётчики и картинки меняются параллельно сигналами и задачами
+        # обработки, поэтому сохраняются только поля из запроса.
+        instance.save(update_fields=('name', 'text', 'cooking_time'))
         return instance
 
     def to_representation(self, instance):
         request = self.context.get('request')
         context = {'request': request}
+        instance = Recipe.objects.for_read(request.user).get(pk=instance.pk)
         return RecipeReadSerializer(instance,
                                     context=context).data
 
@@ -197,7 +344,7 @@ class ShortRecipeSerializer(serializers.ModelSerializer):
     image = serializers.SerializerMethodField()
 
     def get_image(self, obj):
-        return obj.image.url
+        return obj.get_image_url('image_short')
 
     class Meta:
         model = Recipe
@@ -229,13 +376,6 @@ class ShoppingCartSerializer(FavoriteSerializer):
         model = ShoppingСart
 
 
-class RecipeForUserSerializer(serializers.ModelSerializer):
-
-    class Meta:
-        model = Recipe
-        fields = ('id', 'name', 'image', 'cooking_time')
-
-
 class SubscriptionSerializer(CustomUserSerializer):
     recipes = serializers.SerializerMethodField(read_only=True)
     recipes_count = serializers.SerializerMethodField(read_only=True)
@@ -263,12 +403,18 @@ class SubscriptionSerializer(CustomUserSerializer):
 
     @staticmethod
     def get_recipes_count(obj):
+        recipes_count = getattr(obj, 'recipes_count', None)
+        if recipes_count is not None:
+            return recipes_count
         return obj.recipes.count()
 
     def get_recipes(self, obj):
+        recent_recipes = getattr(obj, 'recent_recipes', None)
+        if recent_recipes is not None:
+            return ShortRecipeSerializer(recent_recipes, many=True).data
         request = self.context.get('request')
         recipes = obj.recipes.all()
         recipes_limit = request.query_params.get('recipes_limit')
         if recipes_limit:
             recipes = recipes[:int(recipes_limit)]
-        return RecipeForUserSerializer(recipes, many=True).data
+        return ShortRecipeSerializer(recipes, many=True).data
@@ -0,0 +1,63 @@
+from django.db.models.signals import m2m_changed, post_delete, post_save
+from django.dispatch import receiver
+
+from api.autocomplete import ingredient_index
+from api.cache import response_cache
+from api.catalog import ingredient_catalog
+from api.counting import invalidate_counts
+from api.registry import tag_registry
+from api.relations import invalidate_user_relations
+from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
+                            ShoppingСart, Tag)
+from recipes.signals import ingredients_imported
+from users.models import Subscription
+
+
+@receiver((post_save, post_delete), sender=Ingredient)
+@receiver(ingredients_imported)
+def invalidate_ingredient_caches(**kwargs):
+    ingredient_index.invalidate()
+    ingredient_catalog.invalidate()
+    response_cache.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Tag)
+def invalidate_tag_registry(**kwargs):
+    tag_registry.invalidate()
+    response_cache.invalidate()
+
+
+@receiver((post_save, post_delete), sender=Favorite)
+def invalidate_favorites(instance, **kwargs):
+    invalidate_user_relations(instance.user_id, 'favorites')
+    invalidate_counts(instance.user_id)
+
+
+@receiver((post_save, post_delete), sender=ShoppingСart)
+def invalidate_shopping_cart(instance, **kwargs):
+    invalidate_user_relations(instance.user_id, 'shopping_cart')
+    invalidate_counts(instance.user_id)
+
+
+@receiver((post_save, post_delete), sender=Subscription)
+def invalidate_subscriptions(instance, **kwargs):
+    invalidate_user_relations(instance.user_id, 'subscriptions')
+
+
+@receiver(post_save, sender=Recipe)
+def invalidate_recipe_counts(created, **kwargs):
+    if created:
+        invalidate_counts()
+
+
+@receiver(post_delete, sender=Recipe)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_counts_on_change(**kwargs):
+    invalidate_counts()
+
+
+@receiver((post_save, post_delete), sender=Recipe)
+@receiver((post_save, post_delete), sender=IngredientAmount)
+@receiver(m2m_changed, sender=Recipe.tags.through)
+def invalidate_recipe_responses(**kwargs):
+    response_cache.invalidate()
@@ -0,0 +1,92 @@
+"""Общие данные и настройки для тестов API."""
+import shutil
+import tempfile
+from base64 import b64encode
+from io import BytesIO
+
+from django.core.cache import cache
+from django.test import override_settings
+from PIL import Image
+from rest_framework.test import APITestCase
+
+from api.autocomplete import ingredient_index
+from api.catalog import ingredient_catalog
+from api.registry import tag_registry
+from recipes.models import Ingredient, IngredientAmount, Recipe, Tag
+from users.models import User
+
+
+def make_image_data(color='red', size=(64, 64), image_format='PNG'):
+    """Картинка в виде data URL, как её присылает фронтенд."""
+    buffer = BytesIO()
+    Image.new('RGB', size, color).save(buffer, image_format)
+    content_type = Image.MIME[image_format]
+    return (f'data:{content_type};base64,'
+            f'{b64encode(buffer.getvalue()).decode()}')
+
+
+class TempMediaMixin:
+    """Пишет загруженные файлы во временный MEDIA_ROOT."""
+
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.media_root = tempfile.mkdtemp()
+        cls.media = override_settings(
+            MEDIA_ROOT=cls.media_root, IMAGE_TASK_BACKEND='db'
+        )
+        cls.media.enable()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.media.disable()
+        shutil.rmtree(cls.media_root, ignore_errors=True)
+        super().tearDownClass()
+
+
+class APITestBase(APITestCase):
+    """Сбрасывает кэши процесса и создаёт тестовые данные."""
+
+    def setUp(self):
+        cache.clear()
+        ingredient_index.invalidate()
+        ingredient_catalog.invalidate()
+        tag_registry.invalidate()
+
+    @staticmethod
+    def create_user(name):
+        return User.objects.create(
+            email=f'{name}@example.com', username=name
+        )
+
+    @staticmethod
+    def create_tags(count):
+        return [
+            Tag.objects.create(name=f'Тэг {i}', slug=f'tag-{i}',
+                               color='#000000')
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def create_ingredients(count, name='Ингредиент'):
+        return [
+            Ingredient.objects.create(name=f'{name} {i}',
+                                      measurement_unit='г')
+            for i in range(count)
+        ]
+
+    @staticmethod
+    def create_recipe(author, tags=(), ingredients=(), **kwargs):
+        recipe = Recipe.objects.create(
+            author=author,
+            name=kwargs.pop('name', 'Рецепт'),
+            text='Описание',
+            cooking_time=10,
+            **kwargs,
+        )
+        recipe.tags.set(tags)
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(recipe=recipe, ingredient=ingredient, amount=i)
+            for i, ingredient in enumerate(ingredients, 1)
+        )
+        return recipe
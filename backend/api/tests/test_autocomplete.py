@@ -0,0 +1,68 @@
+import tempfile
+from io import StringIO
+
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import override_settings
+
+from api.autocomplete import ingredient_index
+from api.tests.base import APITestBase
+from api.versions import INGREDIENTS_VERSION, get_cache_key
+from recipes.models import Ingredient
+
+
+class IngredientIndexTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        for name in ('Соль', 'Сахар', 'Морская соль', 'Фасоль', 'Сода'):
+            Ingredient.objects.create(name=name, measurement_unit='г')
+
+    def names(self, query, limit=10):
+        return [row['name'] for row in ingredient_index.search(query, limit)]
+
+    def test_prefix_matches_come_before_substring_matches(self):
+        self.assertEqual(
+            self.names('сол'), ['Соль', 'Морская соль', 'Фасоль']
+        )
+        self.assertEqual(self.names('со', limit=2), ['Сода', 'Соль'])
+
+    def test_endpoint_uses_index(self):
+        response = self.client.get('/api/ingredients/', {'name': 'сах'})
+        self.assertEqual(
+            [row['name'] for row in response.json()], ['Сахар']
+        )
+
+    def test_rebuilds_after_version_change_in_another_process(self):
+        self.names('сол')
+        Ingredient.objects.bulk_create(
+            [Ingredient(name='Соль крупная', measurement_unit='г')]
+        )
+        self.assertNotIn('Соль крупная', self.names('сол'))
+        cache.set(get_cache_key(INGREDIENTS_VERSION), 'other', None)
+        self.assertIn('Соль крупная', self.names('сол'))
+
+    @override_settings(INGREDIENT_CACHE_TTL=0)
+    def test_rebuilds_after_ttl(self):
+        self.names('сол')
+        Ingredient.objects.bulk_create(
+            [Ingredient(name='Соль крупная', measurement_unit='г')]
+        )
+        self.assertIn('Соль крупная', self.names('сол'))
+
+    def test_import_command_bumps_version(self):
+        self.names('сол')
+        version = cache.get(get_cache_key(INGREDIENTS_VERSION))
+        with tempfile.NamedTemporaryFile(
+            'w', suffix='.csv', encoding='utf-8'
+        ) as file:
+            file.write('Соль крупная,г\n')
+            file.flush()
+            with self.captureOnCommitCallbacks(execute=True):
+                call_command(
+                    'import_ingredients', file.name, stdout=StringIO()
+                )
+        self.assertNotEqual(
+            cache.get(get_cache_key(INGREDIENTS_VERSION)), version
+        )
+        self.assertIn('Соль крупная', self.names('сол'))
@@ -0,0 +1,341 @@
+"""
+Бенчмарки производительности.
+
+Пропускаются, если не задана переменная окружения BENCHMARK:
+
+    BENCHMARK=1 python manage.py test api.tests.test_benchmarks
+
+Время - лучшее из нескольких запусков, память - пик tracemalloc.
+"""
+import os
+import tracemalloc
+from csv import reader
+from time import perf_counter
+from unittest import skipUnless
+
+from django.conf import settings
+from django.db.models import Count
+from django.http import HttpResponse
+from django.test import override_settings, tag
+from reportlab.pdfgen import canvas
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.autocomplete import ingredient_index
+from api.pagination import KeysetPagination
+from api.pdf import FONT_NAME, register_fonts
+from api.serializers import RecipeReadSerializer
+from api.tests.base import APITestBase
+from api.tests.test_serializers import LegacyRecipeReadSerializer
+from recipes.feed import heavy_followers, publish_recipe
+from recipes.models import (FeedEntry, Ingredient, IngredientAmount, Recipe,
+                            ShoppingСart)
+from users.models import Subscription, User
+
+
+def measure(func, repeat=5):
+    """Лучшее время в миллисекундах и пик памяти в КиБ."""
+    best = float('inf')
+    for _ in range(repeat):
+        start = perf_counter()
+        func()
+        best = min(best, perf_counter() - start)
+    tracemalloc.start()
+    func()
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return best * 1000, peak / 1024
+
+
+@tag('benchmark')
+@skipUnless(os.getenv('BENCHMARK'), 'Бенчмарки запускаются с BENCHMARK=1')
+class BenchmarkBase(APITestBase):
+
+    def report(self, title, results):
+        print(f'\n{title}')
+        for name, (elapsed, peak) in results.items():
+            print(f'  {name:<40} {elapsed:10.1f} мс {peak:12.0f} КиБ')
+
+
+def legacy_shopping_list(user):
+    """Прежняя выгрузка: сумма в Python и PDF в памяти одной страницей."""
+    final_list = {}
+    for name, unit, amount in IngredientAmount.objects.filter(
+        recipe__shoppingcart_recipe__user=user
+    ).values_list(
+        'ingredient__name', 'ingredient__measurement_unit', 'amount'
+    ):
+        if name not in final_list:
+            final_list[name] = {'measurement_unit': unit, 'amount': amount}
+        else:
+            final_list[name]['amount'] += amount
+    response = HttpResponse(content_type='application/pdf')
+    page = canvas.Canvas(response)
+    page.setFont(FONT_NAME, size=16)
+    height = 750
+    for i, (name, data) in enumerate(final_list.items(), 1):
+        page.drawString(75, height, (f'<{i}> {name} - {data["amount"]}, '
+                                     f'{data["measurement_unit"]}'))
+        height -= 25
+    page.showPage()
+    page.save()
+    return response
+
+
+class ShoppingListBenchmark(BenchmarkBase):
+    recipes = 500
+    ingredients = 2000
+    per_recipe = 30
+
+    def setUp(self):
+        super().setUp()
+        register_fonts()
+        self.user = self.create_user('user')
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'Ингредиент {i}', measurement_unit='г')
+            for i in range(self.ingredients)
+        )
+        Recipe.objects.bulk_create(
+            Recipe(author=self.user, name=f'Рецепт {i}', text='Описание',
+                   cooking_time=10)
+            for i in range(self.recipes)
+        )
+        ingredient_ids = list(Ingredient.objects.values_list('id', flat=True))
+        recipe_ids = list(Recipe.objects.values_list('id', flat=True))
+        IngredientAmount.objects.bulk_create(
+            IngredientAmount(
+                recipe_id=recipe_id,
+                ingredient_id=ingredient_ids[
+                    (number * 7 + i) % len(ingredient_ids)
+                ],
+                amount=i + 1,
+            )
+            for number, recipe_id in enumerate(recipe_ids)
+            for i in range(self.per_recipe)
+        )
+        ShoppingСart.objects.bulk_create(
+            ShoppingСart(user=self.user, recipe_id=recipe_id)
+            for recipe_id in recipe_ids
+        )
+        self.client.force_authenticate(self.user)
+
+    def download(self):
+        response = self.client.get(
+            '/api/recipes/download_shopping_cart/', {'format': 'pdf'}
+        )
+        for _ in response.streaming_content:
+            pass
+
+    def test_shopping_list(self):
+        self.report(
+            f'Список покупок: {self.recipes} рецептов '
+            f'по {self.per_recipe} ингредиентов',
+            {
+                'старый путь (Python + HttpResponse)': measure(
+                    lambda: legacy_shopping_list(self.user).content
+                ),
+                'новый путь (GROUP BY + поток)': measure(self.download),
+            },
+        )
+
+
+class AutocompleteBenchmark(BenchmarkBase):
+    """Справочник ингредиентов, увеличенный в 100 раз."""
+    scale = 100
+    queries = ('сол', 'мол', 'кар', 'пер', 'сыр')
+
+    def setUp(self):
+        super().setUp()
+        path = os.path.join(settings.BASE_DIR, 'data', 'ingredients.csv')
+        with open(path, encoding='utf-8') as file:
+            rows = [row for row in reader(file) if row]
+        Ingredient.objects.bulk_create(
+            (
+                Ingredient(name=f'{name} {copy}' if copy else name,
+                           measurement_unit=unit)
+                for copy in range(self.scale)
+                for name, unit in rows
+            ),
+            batch_size=5000,
+        )
+        self.limit = settings.INGREDIENT_SEARCH_LIMIT
+
+    def search_orm(self):
+        for query in self.queries:
+            list(Ingredient.objects.filter(
+                name__istartswith=query
+            ).values('id', 'name', 'measurement_unit')[:self.limit])
+
+    def search_index(self):
+        for query in self.queries:
+            ingredient_index.search(query, self.limit)
+
+    def test_autocomplete(self):
+        build = measure(ingredient_index._build, repeat=1)
+        self.report(
+            f'Автодополнение: {Ingredient.objects.count()} ингредиентов, '
+            f'{len(self.queries)} запросов',
+            {
+                'ORM, istartswith': measure(self.search_orm),
+                'индекс в памяти': measure(self.search_index),
+                'построение индекса': build,
+            },
+        )
+
+
+class PaginationBenchmark(BenchmarkBase):
+    """Время страницы ленты рецептов на разной глубине."""
+    recipes = 100000
+    offsets = (0, 1000, 10000, 50000, 99000)
+    page_size = 6
+
+    def setUp(self):
+        super().setUp()
+        author = self.create_user('author')
+        Recipe.objects.bulk_create(
+            (Recipe(author=author, name=f'Рецепт {i}', text='Описание',
+                    cooking_time=10)
+             for i in range(self.recipes)),
+            batch_size=5000,
+        )
+        self.client.force_authenticate(author)
+
+    def get(self, params):
+        response = self.client.get(
+            '/api/recipes/', {'limit': self.page_size, **params}
+        )
+        self.assertEqual(response.status_code, 200)
+
+    def test_deep_pages(self):
+        ordered = Recipe.objects.order_by('-pub_date', '-id')
+        results = {}
+        for offset in self.offsets:
+            page = offset // self.page_size + 1
+            results[f'page={page}'] = measure(
+                lambda: self.get({'page': page})
+            )
+            cursor = ''
+            if offset:
+                cursor = KeysetPagination().encode_cursor(
+                    ordered[offset - 1]
+                )
+            results[f'cursor на позиции {offset}'] = measure(
+                lambda: self.get({'cursor': cursor})
+            )
+        self.report(
+            f'Страницы по {self.page_size} из {self.recipes} рецептов',
+            results,
+        )
+
+
+class SerializationBenchmark(BenchmarkBase):
+    """Страница рецептов в JSON: прежний сериализатор и текущий."""
+    recipes = 100
+
+    def setUp(self):
+        super().setUp()
+        author = self.create_user('author')
+        tags = self.create_tags(3)
+        ingredients = self.create_ingredients(10)
+        for i in range(self.recipes):
+            self.create_recipe(author, tags, ingredients, name=f'Рецепт {i}',
+                               image='recipes/a.png',
+                               image_list='recipes/list/a.webp')
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = author
+        self.page = list(Recipe.objects.for_read(author))
+        context = {'request': request}
+        self.serializer = RecipeReadSerializer(
+            self.page, many=True, context=context
+        )
+        self.legacy = LegacyRecipeReadSerializer(
+            self.page, many=True, context=context
+        )
+        self.serialize_fast()
+
+    def serialize_fast(self):
+        return JSONRenderer().render(
+            self.serializer.to_representation(self.page)
+        )
+
+    def serialize_legacy(self):
+        return JSONRenderer().render(
+            self.legacy.to_representation(self.page)
+        )
+
+    def test_serialization(self):
+        with self.assertNumQueries(0):
+            self.serialize_fast()
+        self.report(
+            f'Сериализация {self.recipes} рецептов по 10 ингредиентов',
+            {
+                'прежний сериализатор': measure(
+                    self.serialize_legacy, repeat=5
+                ),
+                'to_representation': measure(
+                    self.serialize_fast, repeat=20
+                ),
+            },
+        )
+
+
+def legacy_heavy_followers(author_id):
+    """Прежний отбор: группировка по всей таблице Subscription."""
+    heavy_users = Subscription.objects.order_by().values('user').annotate(
+        count=Count('pk')
+    ).filter(count__gte=settings.FEED_MATERIALIZE_THRESHOLD).values('user')
+    return Subscription.objects.filter(
+        author_id=author_id, user__in=heavy_users
+    ).values_list('user_id', flat=True)
+
+
+@override_settings(FEED_MATERIALIZE_THRESHOLD=5)
+class FeedBenchmark(BenchmarkBase):
+    """Отбор материализованных лент при публикации рецепта."""
+    users = 2000
+    authors = 100
+    followers = 20
+
+    def setUp(self):
+        super().setUp()
+        User.objects.bulk_create(
+            User(email=f'user{i}@example.com', username=f'user{i}')
+            for i in range(self.users + self.authors)
+        )
+        ids = list(User.objects.order_by('id').values_list('id', flat=True))
+        users, authors = ids[:self.users], ids[self.users:]
+        self.author = authors[0]
+        # У i-го пользователя 1 + i % 9 подписок, всего около 10 000;
+        # на первого автора подписаны только первые followers.
+        Subscription.objects.bulk_create(
+            (Subscription(user_id=user, author_id=author)
+             for i, user in enumerate(users)
+             for author in authors[i >= self.followers:][:1 + i % 9]),
+            batch_size=5000,
+        )
+        self.recipe = Recipe.objects.create(
+            author_id=self.author, name='Рецепт', text='Описание',
+            cooking_time=10,
+        )
+
+    def publish(self):
+        FeedEntry.objects.filter(recipe=self.recipe).delete()
+        publish_recipe(self.recipe)
+
+    def test_heavy_followers(self):
+        expected = set(legacy_heavy_followers(self.author))
+        self.assertEqual(set(heavy_followers(self.author)), expected)
+        self.report(
+            f'Подписчики с лентой среди {Subscription.objects.count()} '
+            'подписок',
+            {
+                'группировка всей таблицы': measure(
+                    lambda: list(legacy_heavy_followers(self.author))
+                ),
+                'подписчики автора': measure(
+                    lambda: list(heavy_followers(self.author))
+                ),
+                'publish_recipe': measure(self.publish),
+            },
+        )
@@ -0,0 +1,42 @@
+from django.core.cache import cache
+
+from api.tests.base import APITestBase
+from api.versions import INGREDIENTS_VERSION, get_cache_key
+from recipes.models import Ingredient
+
+URL = '/api/ingredients/'
+
+
+class IngredientCatalogTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.create_ingredients(3)
+
+    def test_full_list_and_etag(self):
+        response = self.client.get(URL)
+        self.assertEqual(len(response.json()), 3)
+        etag = response['ETag']
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_gzip(self):
+        response = self.client.get(URL, HTTP_ACCEPT_ENCODING='gzip')
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+
+    def test_rebuilds_after_version_change_in_another_process(self):
+        etag = self.client.get(URL)['ETag']
+        Ingredient.objects.bulk_create(
+            [Ingredient(name='Соль', measurement_unit='г')]
+        )
+        self.assertEqual(self.client.get(URL)['ETag'], etag)
+        cache.set(get_cache_key(INGREDIENTS_VERSION), 'other', None)
+        response = self.client.get(URL)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(len(response.json()), 4)
+
+    def test_ingredient_change_rebuilds_catalog(self):
+        self.client.get(URL)
+        with self.captureOnCommitCallbacks(execute=True):
+            Ingredient.objects.create(name='Соль', measurement_unit='г')
+        self.assertEqual(len(self.client.get(URL).json()), 4)
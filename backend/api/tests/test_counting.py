@@ -0,0 +1,53 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import APITestBase
+from recipes.models import Favorite
+
+URL = '/api/recipes/'
+
+
+class CachedCountTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.other = self.create_user('other')
+        self.recipes = [
+            self.create_recipe(self.user, name=f'Рецепт {i}')
+            for i in range(5)
+        ]
+        Favorite.objects.create(user=self.user, recipe=self.recipes[0])
+
+    def get(self, user=None, **params):
+        self.client.force_authenticate(user)
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        counted = any('COUNT(' in query['sql'] for query in queries)
+        return response.json()['count'], counted
+
+    def test_count_is_shared_across_pages_and_users(self):
+        self.assertEqual(self.get(self.user, limit=2), (5, True))
+        self.assertEqual(self.get(self.user, limit=2, page=2), (5, False))
+        self.assertEqual(self.get(self.other, limit=3), (5, False))
+        self.assertEqual(self.get(limit=3, ordering='popular'), (5, False))
+
+    def test_user_filters_are_counted_per_user(self):
+        self.assertEqual(self.get(self.user, is_favorited=1), (1, True))
+        self.assertEqual(self.get(self.other, is_favorited=1), (0, True))
+        self.assertEqual(self.get(self.user, is_favorited=1), (1, False))
+
+    def test_favorite_invalidates_only_its_user_counts(self):
+        self.get(self.user)
+        self.get(self.user, is_favorited=1)
+        self.get(self.other, is_favorited=1)
+        Favorite.objects.create(user=self.user, recipe=self.recipes[1])
+        self.assertEqual(self.get(self.user), (5, False))
+        self.assertEqual(self.get(self.other, is_favorited=1), (0, False))
+        self.assertEqual(self.get(self.user, is_favorited=1), (2, True))
+
+    def test_new_recipe_invalidates_counts(self):
+        self.get(self.user)
+        self.create_recipe(self.other)
+        self.assertEqual(self.get(self.user), (6, True))
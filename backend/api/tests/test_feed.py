@@ -0,0 +1,79 @@
+from django.test import override_settings
+
+from api.tests.base import APITestBase
+from recipes.feed import heavy_followers, is_materialized
+from recipes.models import FeedEntry
+from users.models import Subscription
+
+
+@override_settings(FEED_MATERIALIZE_THRESHOLD=3)
+class FeedTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.others = [self.create_user(f'other{i}') for i in range(3)]
+        self.heavy = self.create_user('heavy')
+        self.light = self.create_user('light')
+        self.stranger = self.create_user('stranger')
+        self.subscribe(self.heavy, self.author, *self.others[:2])
+        self.subscribe(self.light, self.author)
+        self.subscribe(self.stranger, *self.others)
+
+    @staticmethod
+    def subscribe(user, *authors):
+        for author in authors:
+            Subscription.objects.create(user=user, author=author)
+
+    def feed_entries(self, user):
+        return set(FeedEntry.objects.filter(
+            user=user
+        ).values_list('recipe_id', flat=True))
+
+    def test_heavy_followers_of_author_only(self):
+        with self.assertNumQueries(1):
+            followers = set(heavy_followers(self.author.id))
+        self.assertEqual(followers, {self.heavy.id})
+
+    def test_publish_only_to_heavy_followers(self):
+        recipe = self.create_recipe(self.author)
+        self.assertEqual(self.feed_entries(self.heavy), {recipe.id})
+        self.assertEqual(self.feed_entries(self.light), set())
+        self.assertEqual(self.feed_entries(self.stranger), set())
+
+    def test_subscribe_across_threshold_fills_feed(self):
+        recipes = {self.create_recipe(self.author).id,
+                   self.create_recipe(self.others[0]).id}
+        self.subscribe(self.light, self.others[0])
+        self.assertFalse(is_materialized(self.light))
+        self.assertEqual(self.feed_entries(self.light), set())
+        self.subscribe(self.light, self.others[1])
+        self.assertTrue(is_materialized(self.light))
+        self.assertEqual(self.feed_entries(self.light), recipes)
+
+    def test_unsubscribe_clears_feed(self):
+        self.create_recipe(self.author)
+        other = self.create_recipe(self.others[0]).id
+        self.subscribe(self.heavy, self.others[2])
+        Subscription.objects.get(user=self.heavy, author=self.author).delete()
+        self.assertEqual(self.feed_entries(self.heavy), {other})
+        Subscription.objects.get(
+            user=self.heavy, author=self.others[2]
+        ).delete()
+        self.assertFalse(is_materialized(self.heavy))
+        self.assertEqual(self.feed_entries(self.heavy), set())
+
+    def get_feed(self, user):
+        self.client.force_authenticate(user)
+        response = self.client.get('/api/recipes/feed/')
+        self.assertEqual(response.status_code, 200)
+        return [recipe['id'] for recipe in response.data['results']]
+
+    def test_feed_same_with_and_without_materialization(self):
+        expected = [
+            self.create_recipe(author, name=f'Рецепт {i}').id
+            for i, author in enumerate((self.author, *self.others))
+        ][-2::-1]
+        self.assertEqual(self.get_feed(self.heavy), expected)
+        with override_settings(FEED_MATERIALIZE_THRESHOLD=0):
+            self.assertEqual(self.get_feed(self.heavy), expected)
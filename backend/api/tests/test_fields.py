@@ -0,0 +1,73 @@
+import tracemalloc
+from base64 import b64encode
+from io import BytesIO
+
+from django.test import SimpleTestCase, override_settings
+from PIL import Image
+from rest_framework.exceptions import ValidationError
+
+from api.fields import Base64ImageField
+
+
+def image_bytes(image_format='PNG', size=(64, 64)):
+    buffer = BytesIO()
+    Image.new('RGB', size, 'red').save(buffer, image_format)
+    return buffer.getvalue()
+
+
+def data_url(content, content_type='image/png'):
+    return f'data:{content_type};base64,{b64encode(content).decode()}'
+
+
+class Base64ImageFieldTests(SimpleTestCase):
+
+    def assert_fails(self, data, code):
+        with self.assertRaises(ValidationError) as context:
+            Base64ImageField().to_internal_value(data)
+        self.assertEqual(context.exception.detail[0].code, code)
+
+    def test_valid_image(self):
+        upload = Base64ImageField().to_internal_value(
+            data_url(image_bytes('WEBP'), 'image/webp')
+        )
+        self.assertEqual(upload.content_type, 'image/webp')
+        self.assertTrue(upload.name.endswith('.webp'))
+        with Image.open(upload) as image:
+            self.assertEqual(image.size, (64, 64))
+        upload.close()
+
+    def test_truncated_headers(self):
+        for image_format, length in (('WEBP', 20), ('WEBP', 30),
+                                     ('PNG', 20), ('GIF', 8)):
+            with self.subTest(image_format=image_format, length=length):
+                content = image_bytes(image_format)[:length]
+                self.assert_fails(data_url(content), 'invalid_image')
+
+    def test_unknown_signature(self):
+        self.assert_fails(data_url(b'not an image'), 'invalid_image')
+        self.assert_fails(data_url(b''), 'invalid_image')
+
+    def test_invalid_content_type(self):
+        self.assert_fails(
+            data_url(image_bytes(), 'image/svg+xml'), 'invalid_type'
+        )
+
+    def test_invalid_base64(self):
+        self.assert_fails('data:image/png;base64,@@@@', 'invalid')
+        self.assert_fails(42, 'invalid')
+
+    @override_settings(RECIPE_IMAGE_MAX_SIZE=1024)
+    def test_oversize(self):
+        self.assert_fails(data_url(image_bytes(size=(512, 512))), 'max_size')
+
+    def test_large_image_decoded_in_bounded_memory(self):
+        size = 8 * 1024 * 1024
+        content = image_bytes()
+        data = data_url(content + bytes(size - len(content)))
+        tracemalloc.start()
+        upload = Base64ImageField().to_internal_value(data)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+        upload.close()
+        self.assertEqual(upload.size, size)
+        self.assertLess(peak, 2 * 1024 * 1024)
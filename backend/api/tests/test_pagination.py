@@ -0,0 +1,56 @@
+from django.utils import timezone
+
+from api.tests.base import APITestBase
+from recipes.models import Recipe
+
+URL = '/api/recipes/'
+
+
+class KeysetPaginationTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        author = self.create_user('author')
+        for i in range(10):
+            self.create_recipe(author, name=f'Рецепт {i}')
+        # Половина рецептов с одинаковой датой: порядок держится на id.
+        Recipe.objects.filter(
+            pk__in=Recipe.objects.order_by('pk').values('pk')[:5]
+        ).update(pub_date=timezone.now())
+
+    def walk(self, limit):
+        ids, pages = [], 0
+        response = self.client.get(URL, {'cursor': '', 'limit': limit})
+        while True:
+            self.assertEqual(response.status_code, 200)
+            data = response.json()
+            self.assertNotIn('count', data)
+            ids.extend(item['id'] for item in data['results'])
+            pages += 1
+            if data['next'] is None:
+                return ids, pages
+            response = self.client.get(data['next'])
+
+    def test_cursor_walks_all_recipes_once(self):
+        expected = list(Recipe.objects.order_by(
+            '-pub_date', '-id'
+        ).values_list('id', flat=True))
+        ids, pages = self.walk(3)
+        self.assertEqual(ids, expected)
+        self.assertEqual(pages, 4)
+
+    def test_page_numbers_are_kept_for_legacy_clients(self):
+        response = self.client.get(URL, {'page': 2, 'limit': 4})
+        data = response.json()
+        self.assertEqual(data['count'], 10)
+        self.assertEqual(len(data['results']), 4)
+
+    def test_ordering_falls_back_to_page_numbers(self):
+        response = self.client.get(
+            URL, {'cursor': '', 'ordering': 'popular'}
+        )
+        self.assertIn('count', response.json())
+
+    def test_invalid_cursor(self):
+        response = self.client.get(URL, {'cursor': 'не курсор'})
+        self.assertEqual(response.status_code, 404)
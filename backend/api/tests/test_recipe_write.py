@@ -0,0 +1,146 @@
+from unittest.mock import patch
+
+from django.db import connection
+from django.db.models import F
+from django.test.utils import CaptureQueriesContext
+
+from api.serializers import RecipeWriteSerializer
+from api.tests.base import APITestBase, TempMediaMixin, make_image_data
+from recipes.models import IMAGE_READY, IngredientAmount, Recipe
+
+TABLE = IngredientAmount._meta.db_table
+
+
+def count_writes(queries):
+    """Число INSERT, UPDATE и DELETE в таблицу количеств ингредиентов."""
+    writes = {'INSERT': 0, 'UPDATE': 0, 'DELETE': 0}
+    for query in queries:
+        sql = query['sql']
+        statement = sql.split(None, 1)[0].upper()
+        if statement in writes and TABLE in sql.split('WHERE')[0]:
+            writes[statement] += 1
+    return writes
+
+
+class RecipeWriteTests(TempMediaMixin, APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('author')
+        self.tags = self.create_tags(2)
+        self.ingredients = self.create_ingredients(40)
+        self.client.force_authenticate(self.user)
+
+    def payload(self, ingredients, **kwargs):
+        return {
+            'name': 'Суп',
+            'text': 'Варить',
+            'cooking_time': 10,
+            'image': make_image_data(),
+            'tags': [tag.id for tag in self.tags],
+            'ingredients': [
+                {'id': ingredient.id, 'amount': amount}
+                for ingredient, amount in ingredients
+            ],
+            **kwargs,
+        }
+
+    def create(self, count):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.post(
+                '/api/recipes/',
+                self.payload((i, 1) for i in self.ingredients[:count]),
+                format='json',
+            )
+        self.assertEqual(response.status_code, 201, response.data)
+        return response.json()['id'], queries
+
+    def test_create_inserts_ingredients_in_one_statement(self):
+        self.create(3)
+        _, few = self.create(3)
+        recipe_id, many = self.create(30)
+        self.assertEqual(
+            count_writes(many), {'INSERT': 1, 'UPDATE': 0, 'DELETE': 0}
+        )
+        self.assertEqual(len(few), len(many))
+        self.assertEqual(
+            IngredientAmount.objects.filter(recipe_id=recipe_id).count(), 30
+        )
+
+    def test_update_writes_only_the_diff(self):
+        recipe_id, _ = self.create(30)
+        kept = [(ingredient, 1) for ingredient in self.ingredients[:15]]
+        changed = [(ingredient, 5) for ingredient in self.ingredients[15:25]]
+        added = [(ingredient, 2) for ingredient in self.ingredients[30:35]]
+        payload = self.payload(kept + changed + added)
+        del payload['image']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/recipes/{recipe_id}/', payload, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            count_writes(queries), {'INSERT': 1, 'UPDATE': 1, 'DELETE': 1}
+        )
+        amounts = dict(IngredientAmount.objects.filter(
+            recipe_id=recipe_id
+        ).values_list('ingredient_id', 'amount'))
+        expected = {
+            ingredient.id: amount
+            for ingredient, amount in kept + changed + added
+        }
+        self.assertEqual(amounts, expected)
+
+    def test_unchanged_update_does_not_touch_ingredients(self):
+        recipe_id, _ = self.create(30)
+        payload = self.payload((i, 1) for i in self.ingredients[:30])
+        del payload['image']
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.patch(
+                f'/api/recipes/{recipe_id}/', payload, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        self.assertEqual(
+            count_writes(queries), {'INSERT': 0, 'UPDATE': 0, 'DELETE': 0}
+        )
+
+    def test_truncated_image_is_rejected(self):
+        image = make_image_data(image_format='WEBP')
+        header, content = image.split(',')
+        response = self.client.post(
+            '/api/recipes/',
+            self.payload(
+                [(self.ingredients[0], 1)], image=f'{header},{content[:40]}'
+            ),
+            format='json',
+        )
+        self.assertEqual(response.status_code, 400)
+        self.assertEqual(response.data['image'][0].code, 'invalid_image')
+
+    def test_update_keeps_concurrent_changes(self):
+        recipe_id, _ = self.create(3)
+        update_ingredients = RecipeWriteSerializer.update_ingredients
+
+        def concurrent_update(serializer, ingredients, recipe):
+            Recipe.objects.filter(pk=recipe_id).update(
+                favorites_count=F('favorites_count') + 1,
+                image='recipes/ready.webp',
+                image_status=IMAGE_READY,
+            )
+            update_ingredients(serializer, ingredients, recipe)
+
+        payload = self.payload(
+            ((i, 1) for i in self.ingredients[:3]), name='Борщ'
+        )
+        del payload['image']
+        with patch.object(RecipeWriteSerializer, 'update_ingredients',
+                          concurrent_update):
+            response = self.client.patch(
+                f'/api/recipes/{recipe_id}/', payload, format='json'
+            )
+        self.assertEqual(response.status_code, 200, response.data)
+        recipe = Recipe.objects.get(pk=recipe_id)
+        self.assertEqual(recipe.name, 'Борщ')
+        self.assertEqual(recipe.favorites_count, 1)
+        self.assertEqual(recipe.image.name, 'recipes/ready.webp')
+        self.assertEqual(recipe.image_status, IMAGE_READY)
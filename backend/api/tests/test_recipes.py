@@ -0,0 +1,77 @@
+from django.core.cache import cache
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.registry import tag_registry
+from api.tests.base import APITestBase
+from recipes.models import Favorite, ShoppingСart
+from users.models import Subscription
+
+
+class RecipeListTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        author = self.create_user('author')
+        tags = self.create_tags(3)
+        ingredients = self.create_ingredients(5)
+        self.recipes = [
+            self.create_recipe(author, tags, ingredients, name=f'Рецепт {i}')
+            for i in range(12)
+        ]
+        Subscription.objects.create(user=self.user, author=author)
+        Favorite.objects.create(user=self.user, recipe=self.recipes[0])
+        ShoppingСart.objects.create(user=self.user, recipe=self.recipes[1])
+        self.client.force_authenticate(self.user)
+
+    def get_list(self, limit):
+        cache.clear()
+        # Очистка кэша меняет версию тэгов, справочник строится заранее.
+        tag_registry.get_catalog()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/recipes/', {'limit': limit})
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        self.get_list(1)
+        _, small = self.get_list(2)
+        results, large = self.get_list(12)
+        self.assertEqual(len(results), 12)
+        self.assertEqual(small, large)
+        # COUNT, рецепты с флагами, тэги и ингредиенты страницы;
+        # в PostgreSQL перед COUNT берётся оценка планировщика.
+        self.assertEqual(large, 5 if connection.vendor == 'postgresql' else 4)
+
+    def test_flags_are_annotated(self):
+        results, _ = self.get_list(12)
+        flags = {
+            item['id']: (item['is_favorited'], item['is_in_shopping_cart'],
+                         item['author']['is_subscribed'])
+            for item in results
+        }
+        self.assertEqual(flags[self.recipes[0].id], (True, False, True))
+        self.assertEqual(flags[self.recipes[1].id], (False, True, True))
+        self.assertEqual(flags[self.recipes[2].id], (False, False, True))
+
+
+class RecipeTagFilterTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        author = self.create_user('author')
+        self.tags = self.create_tags(3)
+        self.recipe = self.create_recipe(author, self.tags[:2])
+        self.create_recipe(author, self.tags[2:], name='Другой')
+
+    def test_recipe_matching_several_tags_is_returned_once(self):
+        response = self.client.get(
+            '/api/recipes/', {'tags': ['tag-0', 'tag-1']}
+        )
+        self.assertEqual(response.status_code, 200)
+        data = response.json()
+        self.assertEqual(data['count'], 1)
+        self.assertEqual(
+            [recipe['id'] for recipe in data['results']], [self.recipe.id]
+        )
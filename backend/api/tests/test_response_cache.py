@@ -0,0 +1,79 @@
+from io import StringIO
+
+from django.core.management import call_command
+
+from api.cache import response_cache
+from api.tests.base import APITestBase
+from recipes.models import Ingredient, Tag
+
+URL = '/api/recipes/'
+
+
+class ResponseCacheTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.author = self.create_user('author')
+        self.tags = self.create_tags(2)
+        self.recipe = self.create_recipe(self.author, self.tags)
+
+    def get(self, url=URL, **params):
+        response = self.client.get(url, params)
+        self.assertEqual(response.status_code, 200)
+        return response.get('X-Cache')
+
+    def test_hit_after_miss(self):
+        self.assertEqual(self.get(), 'MISS')
+        self.assertEqual(self.get(), 'HIT')
+        detail = f'{URL}{self.recipe.id}/'
+        self.assertEqual(self.get(detail), 'MISS')
+        self.assertEqual(self.get(detail), 'HIT')
+        self.assertEqual(response_cache.stats(), {'hits': 2, 'misses': 2})
+
+    def test_key_ignores_param_order_and_empty_values(self):
+        self.get(tags=['tag-0', 'tag-1'], limit=6)
+        self.assertEqual(
+            self.get(limit=6, tags=['tag-0', 'tag-1'], author=''), 'HIT'
+        )
+        self.assertEqual(self.get(limit=6, tags=['tag-1']), 'MISS')
+
+    def test_authenticated_requests_are_not_cached(self):
+        self.client.force_authenticate(self.author)
+        self.assertIsNone(self.get())
+        self.assertEqual(response_cache.stats(), {'hits': 0, 'misses': 0})
+
+    def test_writes_change_version(self):
+        writes = (
+            lambda: self.create_recipe(self.author, name='Новый'),
+            lambda: Tag.objects.create(name='Новый', slug='new',
+                                       color='#FFFFFF'),
+            lambda: Ingredient.objects.create(name='Соль',
+                                              measurement_unit='г'),
+        )
+        for write in writes:
+            self.get()
+            with self.captureOnCommitCallbacks(execute=True):
+                write()
+            self.assertEqual(self.get(), 'MISS')
+
+    def test_stats_endpoint(self):
+        self.get()
+        self.get()
+        self.client.force_authenticate(self.author)
+        self.assertEqual(self.client.get('/api/cache-stats/').status_code,
+                         403)
+        self.author.is_staff = True
+        self.author.save()
+        response = self.client.get('/api/cache-stats/')
+        self.assertEqual(
+            response.json(), {'hits': 1, 'misses': 1, 'shared': False}
+        )
+
+    def test_stats_command_warns_about_local_cache(self):
+        self.get()
+        stdout, stderr = StringIO(), StringIO()
+        call_command('response_cache_stats', '--reset',
+                     stdout=stdout, stderr=stderr)
+        self.assertIn('misses: 1', stdout.getvalue())
+        self.assertIn('local to each process', stderr.getvalue())
+        self.assertEqual(response_cache.stats(), {'hits': 0, 'misses': 0})
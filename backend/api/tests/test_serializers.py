@@ -0,0 +1,176 @@
+from django.contrib.auth.models import AnonymousUser
+from djoser.serializers import UserSerializer
+from rest_framework import serializers
+from rest_framework.renderers import JSONRenderer
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+
+from api.serializers import RecipeReadSerializer
+from api.tests.base import APITestBase
+from recipes.models import (Favorite, IngredientAmount, Recipe, ShoppingСart,
+                            Tag)
+from users.models import Subscription, User
+
+
+class LegacyUserSerializer(UserSerializer):
+    """CustomUserSerializer до ускорения сериализации."""
+    is_subscribed = serializers.SerializerMethodField()
+
+    class Meta:
+        model = User
+        fields = (
+            'email', 'id', 'username', 'first_name',
+            'last_name', 'is_subscribed'
+        )
+
+    def get_is_subscribed(self, obj):
+        user = self.context.get('request').user
+        if user.is_anonymous:
+            return False
+        return Subscription.objects.filter(user=user, author=obj.id).exists()
+
+
+class LegacyTagSerializer(serializers.ModelSerializer):
+
+    class Meta:
+        model = Tag
+        fields = ('id', 'name', 'color', 'slug')
+
+
+class LegacyIngredientAmountSerializer(serializers.ModelSerializer):
+    id = serializers.ReadOnlyField(source='ingredient.id')
+    name = serializers.ReadOnlyField(source='ingredient.name')
+    measurement_unit = serializers.ReadOnlyField(
+        source='ingredient.measurement_unit'
+    )
+
+    class Meta:
+        model = IngredientAmount
+        fields = ('id', 'name', 'measurement_unit', 'amount')
+
+
+class LegacyRecipeReadSerializer(serializers.ModelSerializer):
+    """
+    RecipeReadSerializer до ускорения сериализации.
+
+    Отличается от текущего только намеренно: картинка - полный URL
+    основного файла (миниатюры и заглушка появились позже), поля
+    image_status ещё нет.
+    """
+    tags = LegacyTagSerializer(many=True, read_only=True)
+    author = LegacyUserSerializer(read_only=True)
+    ingredients = LegacyIngredientAmountSerializer(
+        source='ingredientamount_set',
+        many=True,
+        read_only=True,
+    )
+    image = serializers.SerializerMethodField()
+    is_favorited = serializers.SerializerMethodField(read_only=True)
+    is_in_shopping_cart = serializers.SerializerMethodField(read_only=True)
+
+    class Meta:
+        model = Recipe
+        fields = (
+            'id',
+            'tags',
+            'author',
+            'ingredients',
+            'is_favorited',
+            'is_in_shopping_cart',
+            'name',
+            'image',
+            'text',
+            'cooking_time',
+        )
+
+    def get_image(self, obj):
+        return obj.image.url if obj.image else None
+
+    def get_is_favorited(self, obj):
+        user = self.context.get('request').user
+        if user.is_anonymous:
+            return False
+        return Favorite.objects.filter(user=user, recipe=obj).exists()
+
+    def get_is_in_shopping_cart(self, obj):
+        user = self.context.get('request').user
+        if user.is_anonymous:
+            return False
+        return ShoppingСart.objects.filter(user=user, recipe=obj).exists()
+
+
+def legacy_representation(recipe, context, image_field='image'):
+    """
+    Ответ прежнего сериализатора с намеренными изменениями.
+
+    Картинка берётся нужного размера с заглушкой (миниатюры), после неё
+    добавляется статус обработки (фоновая обработка картинок).
+    """
+    data = LegacyRecipeReadSerializer(recipe, context=context).data
+    expected = {}
+    for key, value in data.items():
+        expected[key] = value
+        if key == 'image':
+            expected[key] = recipe.get_image_url(image_field)
+            expected['image_status'] = recipe.image_status
+    return expected
+
+
+def render(data):
+    return JSONRenderer().render(data)
+
+
+class RecipeReadSerializerTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        author = self.create_user('author')
+        tags = self.create_tags(3)
+        ingredients = self.create_ingredients(4)
+        self.create_recipe(author, tags, ingredients, name='С картинкой',
+                           image='recipes/a.png',
+                           image_list='recipes/list/a.webp')
+        self.create_recipe(author, tags[:1], ingredients[:1], name='Без',
+                           image='recipes/b.png')
+        self.create_recipe(self.user, name='Пустой')
+        recipes = Recipe.objects.order_by('id')
+        Favorite.objects.create(user=self.user, recipe=recipes[0])
+        ShoppingСart.objects.create(user=self.user, recipe=recipes[1])
+        Subscription.objects.create(user=self.user, author=author)
+
+    def make_request(self, user=None):
+        request = Request(APIRequestFactory().get('/api/recipes/'))
+        request.user = user
+        return request
+
+    def check(self, user, recipes=None):
+        request = self.make_request(user)
+        if recipes is None:
+            recipes = list(
+                Recipe.objects.for_read(request.user).order_by('id')
+            )
+        context = {'request': request}
+        self.assertEqual(
+            render(RecipeReadSerializer(
+                recipes, many=True, context=context
+            ).data),
+            render([
+                legacy_representation(recipe, context, 'image_list')
+                for recipe in recipes
+            ]),
+        )
+        for recipe in recipes:
+            self.assertEqual(
+                render(RecipeReadSerializer(recipe, context=context).data),
+                render(legacy_representation(recipe, context)),
+            )
+
+    def test_matches_legacy_serializer_for_user(self):
+        self.check(self.user)
+
+    def test_matches_legacy_serializer_for_anonymous(self):
+        self.check(AnonymousUser())
+
+    def test_matches_without_annotations(self):
+        self.check(self.user, list(Recipe.objects.order_by('id')))
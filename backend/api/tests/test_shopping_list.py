@@ -0,0 +1,62 @@
+import csv
+import json
+
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import APITestBase
+from recipes.models import ShoppingСart
+
+URL = '/api/recipes/download_shopping_cart/'
+
+
+class ShoppingListTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        ingredients = self.create_ingredients(3)
+        for recipe in (
+            self.create_recipe(self.user, ingredients=ingredients),
+            self.create_recipe(self.user, ingredients=ingredients[:2]),
+        ):
+            ShoppingСart.objects.create(user=self.user, recipe=recipe)
+        self.client.force_authenticate(self.user)
+
+    def download(self, export_format):
+        response = self.client.get(URL, {'format': export_format})
+        self.assertEqual(response.status_code, 200)
+        return b''.join(response.streaming_content)
+
+    def test_amounts_are_summed_in_one_query(self):
+        with CaptureQueriesContext(connection) as queries:
+            data = json.loads(self.download('json'))
+        self.assertEqual(len(queries), 1)
+        self.assertEqual(data, [
+            {'name': 'Ингредиент 0', 'measurement_unit': 'г', 'amount': 2},
+            {'name': 'Ингредиент 1', 'measurement_unit': 'г', 'amount': 4},
+            {'name': 'Ингредиент 2', 'measurement_unit': 'г', 'amount': 3},
+        ])
+
+    def test_csv_and_text_formats(self):
+        rows = list(csv.reader(self.download('csv').decode().splitlines()))
+        self.assertEqual(rows[0], ['name', 'measurement_unit', 'amount'])
+        self.assertEqual(rows[2], ['Ингредиент 1', 'г', '4'])
+        text = self.download('txt').decode()
+        self.assertIn('2. Ингредиент 1 - 4, г', text)
+
+    def test_pdf_spans_several_pages(self):
+        ingredients = self.create_ingredients(80, 'Продукт')
+        recipe = self.create_recipe(self.user, ingredients=ingredients)
+        ShoppingСart.objects.create(user=self.user, recipe=recipe)
+        pdf = self.download('pdf')
+        self.assertTrue(pdf.startswith(b'%PDF'))
+        self.assertGreater(pdf.count(b'/Type /Page\n'), 1)
+
+    def test_errors_are_rendered_as_text(self):
+        self.client.force_authenticate(None)
+        response = self.client.get(URL, {'format': 'pdf'})
+        self.assertEqual(response.status_code, 401)
+        self.assertEqual(
+            response['Content-Type'], 'text/plain; charset=utf-8'
+        )
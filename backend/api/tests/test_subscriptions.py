@@ -0,0 +1,71 @@
+from django.db import connection
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import APITestBase
+from recipes.models import Recipe
+from users.models import Subscription
+
+URL = '/api/users/subscriptions/'
+
+
+class SubscriptionListTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.user = self.create_user('user')
+        self.authors = [self.create_user(f'author{i}') for i in range(6)]
+        for number, author in enumerate(self.authors):
+            Subscription.objects.create(user=self.user, author=author)
+            for i in range(number + 1):
+                self.create_recipe(author, name=f'Рецепт {number}.{i}')
+        self.client.force_authenticate(self.user)
+
+    def get(self, **params):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(URL, params)
+        self.assertEqual(response.status_code, 200)
+        return response.json()['results'], len(queries)
+
+    def test_query_count_does_not_depend_on_page_size(self):
+        _, small = self.get(limit=2, recipes_limit=2)
+        results, large = self.get(limit=6, recipes_limit=2)
+        self.assertEqual(len(results), 6)
+        self.assertEqual(small, large)
+        # COUNT, авторы страницы и их последние рецепты.
+        self.assertEqual(large, 3)
+
+    def test_recipes_limit_is_applied_per_author(self):
+        results, _ = self.get(limit=6, recipes_limit=2)
+        for item in results:
+            author = next(a for a in self.authors if a.id == item['id'])
+            latest = Recipe.objects.filter(
+                author=author
+            ).order_by('-pub_date').values_list('id', flat=True)[:2]
+            self.assertEqual(
+                [recipe['id'] for recipe in item['recipes']], list(latest)
+            )
+            self.assertEqual(item['recipes_count'], author.recipes.count())
+            self.assertTrue(item['is_subscribed'])
+
+    def test_latest_by_author(self):
+        ids = [author.id for author in self.authors]
+        with self.assertNumQueries(1):
+            recipes = list(Recipe.objects.latest_by_author(ids, 3))
+        counts = {}
+        for recipe in recipes:
+            counts[recipe.author_id] = counts.get(recipe.author_id, 0) + 1
+        self.assertEqual(
+            counts, {author.id: min(i + 1, 3)
+                     for i, author in enumerate(self.authors)}
+        )
+        dates = [recipe.pub_date for recipe in recipes]
+        self.assertEqual(dates, sorted(dates, reverse=True))
+
+    def test_latest_by_author_without_authors(self):
+        with self.assertNumQueries(0):
+            self.assertEqual(list(Recipe.objects.latest_by_author([], 3)), [])
+
+    def test_user_without_subscriptions(self):
+        self.client.force_authenticate(self.create_user('lonely'))
+        results, _ = self.get(recipes_limit=3)
+        self.assertEqual(results, [])
@@ -0,0 +1,78 @@
+from django.core.cache import cache
+from django.test import override_settings
+
+from api.registry import tag_registry
+from api.tests.base import APITestBase
+from api.versions import TAGS_VERSION, get_cache_key
+from recipes.models import RecipeTag, Tag
+
+URL = '/api/tags/'
+
+
+class TagRegistryTests(APITestBase):
+
+    def setUp(self):
+        super().setUp()
+        self.tags = self.create_tags(2)
+
+    @staticmethod
+    def add_tag_elsewhere():
+        """Тэг, созданный без сигналов, как в другом процессе."""
+        Tag.objects.bulk_create(
+            [Tag(name='Новый', slug='new', color='#FFFFFF')]
+        )
+        return Tag.objects.get(slug='new')
+
+    def test_list_and_etag(self):
+        response = self.client.get(URL)
+        self.assertEqual(
+            [tag['slug'] for tag in response.json()], ['tag-0', 'tag-1']
+        )
+        response = self.client.get(URL, HTTP_IF_NONE_MATCH=response['ETag'])
+        self.assertEqual(response.status_code, 304)
+
+    def test_retrieve(self):
+        tag = self.tags[0]
+        response = self.client.get(f'{URL}{tag.id}/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['slug'], tag.slug)
+        self.assertEqual(self.client.get(f'{URL}999/').status_code, 404)
+        self.assertEqual(self.client.get(f'{URL}abc/').status_code, 404)
+
+    def test_tag_change_rebuilds_registry(self):
+        etag = self.client.get(URL)['ETag']
+        with self.captureOnCommitCallbacks(execute=True):
+            tag = Tag.objects.create(name='Новый', slug='new',
+                                     color='#FFFFFF')
+        response = self.client.get(URL)
+        self.assertNotEqual(response['ETag'], etag)
+        self.assertEqual(self.client.get(f'{URL}{tag.id}/').status_code, 200)
+
+    def test_rebuilds_after_version_change_in_another_process(self):
+        self.client.get(URL)
+        tag = self.add_tag_elsewhere()
+        self.assertEqual(self.client.get(f'{URL}{tag.id}/').status_code, 404)
+        cache.set(get_cache_key(TAGS_VERSION), 'other', None)
+        self.assertEqual(self.client.get(f'{URL}{tag.id}/').status_code, 200)
+
+    @override_settings(TAG_CACHE_TTL=0)
+    def test_rebuilds_after_ttl(self):
+        self.client.get(URL)
+        tag = self.add_tag_elsewhere()
+        self.assertEqual(self.client.get(f'{URL}{tag.id}/').status_code, 200)
+
+    def test_unknown_recipe_tag_rebuilds_registry(self):
+        tag_registry.get_catalog()
+        tag = self.add_tag_elsewhere()
+        author = self.create_user('author')
+        recipe = self.create_recipe(author)
+        RecipeTag.objects.create(recipe=recipe, tag=tag)
+        self.client.force_authenticate(author)
+        response = self.client.get(f'/api/recipes/{recipe.id}/')
+        self.assertEqual(
+            [item['slug'] for item in response.json()['tags']], ['new']
+        )
+        self.assertEqual(
+            self.client.get('/api/recipes/', {'tags': 'new'}).status_code,
+            200,
+        )
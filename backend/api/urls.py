@@ -2,7 +2,8 @@ from django.urls import include, path
 from rest_framework.routers import DefaultRouter
 
 from .views import (CustomUserViewSet, IngredientViewSet, RecipeViewSet,
-                    SubscribeView, SubscriptionViewSet, TagViewSet)
+                    ResponseCacheStatsView, SubscribeView, SubscriptionViewSet,
+                    TagViewSet)
 
 app_name = 'api'
 
@@ -24,6 +25,11 @@ urlpatterns = [
         SubscribeView.as_view(),
         name='subscribe'
     ),
+    path(
+        'cache-stats/',
+        ResponseCacheStatsView.as_view(),
+        name='cache-stats'
+    ),
     path('', include(router_v1.urls)),
     path('', include('djoser.urls')),
     path('auth/', include('djoser.urls.authtoken')),
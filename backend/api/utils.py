@@ -0,0 +1,24 @@
+from django.http import HttpResponse
+from django.utils.cache import get_conditional_response, patch_cache_control
+from django.utils.http import http_date
+
+
+def payload_response(request, payload, etag, last_modified=None,
+                     content_type='application/json', headers=None):
+    """
+    Отдаёт заранее сериализованные байты с ETag и Last-Modified.
+
+    Если у клиента актуальная копия, возвращает 304 Not Modified.
+    """
+    response = get_conditional_response(
+        request, etag=etag, last_modified=last_modified
+    )
+    if response is None:
+        response = HttpResponse(payload, content_type=content_type)
+        for header, value in (headers or {}).items():
+            response[header] = value
+    response['ETag'] = etag
+    if last_modified is not None:
+        response['Last-Modified'] = http_date(last_modified)
+    patch_cache_control(response, no_cache=True)
+    return response
@@ -0,0 +1,79 @@
+"""Версии данных, общие для всех процессов."""
+from threading import Lock
+from time import monotonic
+from uuid import uuid4
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+
+INGREDIENTS_VERSION = 'ingredients'
+TAGS_VERSION = 'tags'
+
+
+def get_cache_key(name):
+    return f'data-version:{name}'
+
+
+def get_version(name):
+    """
+    Текущая версия данных name.
+
+    Версия хранится в кэше по умолчанию, поэтому процессы видят смену
+    версии друг друга, только если этот кэш общий (Redis, Memcached).
+    С locmem кэши в памяти процесса дополнительно ограничены временем
+    жизни.
+    """
+    key = get_cache_key(name)
+    cache.add(key, uuid4().hex, None)
+    return cache.get(key)
+
+
+def bump_version(name):
+    """Меняет версию данных name после коммита транзакции."""
+    transaction.on_commit(
+        lambda: cache.set(get_cache_key(name), uuid4().hex, None)
+    )
+
+
+class VersionedCache:
+    """
+    Значение в памяти процесса, привязанное к общей версии данных.
+
+    Значение строится методом _build() наследника при первом обращении и
+    перестраивается, когда меняется версия version_name или значение
+    старше настройки ttl_setting (в секундах).
+    """
+    version_name = None
+    ttl_setting = 'INGREDIENT_CACHE_TTL'
+
+    def __init__(self):
+        self._lock = Lock()
+        self._state = None
+
+    def invalidate(self):
+        self._state = None
+        bump_version(self.version_name)
+
+    def is_fresh(self, state, version):
+        return state is not None and state[0] == version and (
+            monotonic() - state[1] < getattr(settings, self.ttl_setting)
+        )
+
+    def rebuild(self, version=None):
+        """Перестраивает значение, не меняя общую версию."""
+        if version is None:
+            version = get_version(self.version_name)
+        state = (version, monotonic(), self._build())
+        self._state = state
+        return state[2]
+
+    def get_value(self):
+        version = get_version(self.version_name)
+        state = self._state
+        if not self.is_fresh(state, version):
+            with self._lock:
+                state = self._state
+                if not self.is_fresh(state, version):
+                    return self.rebuild(version)
+        return state[2]
@@ -1,83 +1,88 @@
-from django.shortcuts import HttpResponse, get_object_or_404
+from django.conf import settings
+from django.db.models import BooleanField, Count, F, Sum, Value
+from django.shortcuts import get_object_or_404
 from django_filters.rest_framework import DjangoFilterBackend
 from djoser.views import UserViewSet
-from reportlab.pdfbase import pdfmetrics
-from reportlab.pdfbase.ttfonts import TTFont
-from reportlab.pdfgen import canvas
 from rest_framework import status, views, viewsets
 from rest_framework.decorators import action
+from rest_framework.exceptions import NotFound
 from rest_framework.generics import ListAPIView
-from rest_framework.permissions import (SAFE_METHODS, AllowAny,
+from rest_framework.permissions import (SAFE_METHODS, AllowAny, IsAdminUser,
                                         IsAuthenticated,
                                         IsAuthenticatedOrReadOnly)
 from rest_framework.response import Response
 
-from api.filters import IngredientSearchFilter, RecipesFilter
-from api.pagination import CustomPagination
+from api.autocomplete import ingredient_index
+from api.cache import AnonymousCacheMixin, response_cache
+from api.catalog import ingredient_catalog
+from api.exporters import SHOPPING_LIST_EXPORTERS
+from api.filters import RecipesFilter
+from api.pagination import CustomPagination, KeysetPagination, RecipePagination
 from api.permissions import IsAuthenticatedAuthorOrReadOnly
+from api.registry import tag_registry
 from api.serializers import (CustomUserSerializer, IngredientSerializer,
                              RecipeReadSerializer, RecipeWriteSerializer,
                              ShortRecipeSerializer, SubscriptionSerializer,
                              TagSerializer)
+from api.utils import payload_response
+from recipes.feed import is_materialized
 from recipes.models import (Favorite, Ingredient, IngredientAmount, Recipe,
                             ShoppingСart, Tag)
 from users.models import Subscription, User
 
 
-def pdf_generation(value_list):
-    final_list = {}
-    for item in value_list:
-        name = item[0]
-        if name not in final_list:
-            final_list[name] = {
-                'measurement_unit': item[1],
-                'amount': item[2]
-            }
-        else:
-            final_list[name]['amount'] += item[2]
-    pdfmetrics.registerFont(
-        TTFont('Halogen', 'Halogen.ttf', 'UTF-8'))
-    response = HttpResponse(content_type='application/pdf')
-    response['Content-Disposition'] = (
-        'attachment; '
-        'filename="shopping_list.pdf"'
-    )
-    page = canvas.Canvas(response)
-    page.setFont('Halogen', size=24)
-    page.drawString(200, 800, 'Список ингредиентов')
-    page.setFont('Halogen', size=16)
-    height = 750
-    for i, (name, data) in enumerate(final_list.items(), 1):
-        page.drawString(75, height, (f'<{i}> {name} - {data["amount"]}, '
-                                     f'{data["measurement_unit"]}'))
-        height -= 25
-    page.showPage()
-    page.save()
-    return response
-
-
 class TagViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Tag.objects.all()
     serializer_class = TagSerializer
     permission_classes = (IsAuthenticatedOrReadOnly,)
 
+    def list(self, request, *args, **kwargs):
+        catalog = tag_registry.get_catalog()
+        return payload_response(request, catalog.payload, catalog.etag)
+
+    def retrieve(self, request, *args, **kwargs):
+        pk = kwargs[self.lookup_field]
+        tag = tag_registry.get(int(pk)) if pk.isdigit() else None
+        if tag is None:
+            raise NotFound
+        return Response(tag)
+
 
 class IngredientViewSet(viewsets.ReadOnlyModelViewSet):
     queryset = Ingredient.objects.all()
     serializer_class = IngredientSerializer
     permission_classes = (AllowAny,)
-    filter_backends = (IngredientSearchFilter,)
-    search_fields = ('^name',)
     pagination_class = None
 
+    def list(self, request, *args, **kwargs):
+        name = request.query_params.get('name')
+        if name:
+            return Response(ingredient_index.search(
+                name, settings.INGREDIENT_SEARCH_LIMIT
+            ))
+        catalog = ingredient_catalog.get()
+        headers = {'Vary': 'Accept-Encoding'}
+        payload, etag = catalog.payload, catalog.etag
+        if 'gzip' in request.META.get('HTTP_ACCEPT_ENCODING', ''):
+            payload, etag = catalog.compressed, catalog.compressed_etag
+            headers['Content-Encoding'] = 'gzip'
+        return payload_response(
+            request, payload, etag, catalog.last_modified, headers=headers
+        )
+
 
-class RecipeViewSet(viewsets.ModelViewSet):
+class RecipeViewSet(AnonymousCacheMixin, viewsets.ModelViewSet):
     queryset = Recipe.objects.all()
-    pagination_class = CustomPagination
+    pagination_class = RecipePagination
     filter_backends = (DjangoFilterBackend,)
     filterset_class = RecipesFilter
     permission_classes = [IsAuthenticatedAuthorOrReadOnly]
 
+    def get_queryset(self):
+        if self.request.method in SAFE_METHODS:
+            return Recipe.objects.for_read(self.request.user)
+        return Recipe.objects.all()
+
     def perform_create(self, serializer):
         serializer.save(author=self.request.user)
 
@@ -105,14 +110,29 @@ class RecipeViewSet(viewsets.ModelViewSet):
         return None
 
     @action(detail=False, methods=['get'],
-            permission_classes=[IsAuthenticated])
+            permission_classes=[IsAuthenticated],
+            pagination_class=KeysetPagination)
+    def feed(self, request):
+        queryset = self.filter_queryset(self.get_queryset().feed(
+            request.user, materialized=is_materialized(request.user)
+        ))
+        page = self.paginate_queryset(queryset)
+        serializer = self.get_serializer(page, many=True)
+        return self.get_paginated_response(serializer.data)
+
+    @action(detail=False, methods=['get'],
+            permission_classes=[IsAuthenticated],
+            renderer_classes=SHOPPING_LIST_EXPORTERS)
     def download_shopping_cart(self, request):
         ingredients = IngredientAmount.objects.filter(
             recipe__shoppingcart_recipe__user=request.user
-        ).values_list(
-            'ingredient__name', 'ingredient__measurement_unit',
-            'amount')
-        return pdf_generation(ingredients)
+        ).values(
+            name=F('ingredient__name'),
+            measurement_unit=F('ingredient__measurement_unit'),
+        ).annotate(
+            amount=Sum('amount')
+        ).order_by('name')
+        return request.accepted_renderer.response(ingredients.iterator())
 
     def add_obj(self, model, user, pk):
         if model.objects.filter(user=user, recipe__id=pk).exists():
@@ -147,7 +167,28 @@ class SubscriptionViewSet(ListAPIView):
     filter_backends = (DjangoFilterBackend,)
 
     def get_queryset(self):
-        return User.objects.filter(following__user=self.request.user)
+        return User.objects.filter(
+            following__user=self.request.user
+        ).annotate(
+            recipes_count=Count('recipes'),
+            is_subscribed=Value(True, output_field=BooleanField()),
+        ).order_by('username')
+
+    def paginate_queryset(self, queryset):
+        authors = super().paginate_queryset(queryset)
+        recipes_limit = self.request.query_params.get('recipes_limit')
+        if recipes_limit and recipes_limit.isdigit():
+            recipes = Recipe.objects.latest_by_author(
+                [author.id for author in authors], int(recipes_limit)
+            )
+        else:
+            recipes = Recipe.objects.filter(author__in=authors)
+        recent_recipes = {author.id: [] for author in authors}
+        for recipe in recipes:
+            recent_recipes[recipe.author_id].append(recipe)
+        for author in authors:
+            author.recent_recipes = recent_recipes[author.id]
+        return authors
 
 
 class SubscribeView(views.APIView):
@@ -194,3 +235,14 @@ class SubscribeView(views.APIView):
             {'Вы не подписаны на пользователя'},
             status=status.HTTP_400_BAD_REQUEST
         )
+
+
+class ResponseCacheStatsView(views.APIView):
+    """Счётчики кэша ответов, видимые этому веб-процессу."""
+    permission_classes = (IsAdminUser,)
+
+    def get(self, request):
+        return Response({
+            **response_cache.stats(),
+            'shared': response_cache.is_shared(),
+        })
@@ -139,6 +139,22 @@ DJOSER = {
     },
 }
 
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'api': {
+            'handlers': ['console'],
+            'level': os.getenv('API_LOG_LEVEL', 'INFO'),
+        },
+    },
+}
+
 # CONSTANTS
 
 MAX_LENGTH_TEXT = 200
@@ -146,3 +162,40 @@ MAX_LENGTH_HEX = 7
 
 MAX_LENGTH_EMAIL = 254
 MAX_LENGTH_USER_NAMES_INFO = 150
+
+INGREDIENT_SEARCH_LIMIT = 50
+INGREDIENT_CATALOG_DIR = os.getenv('INGREDIENT_CATALOG_DIR')
+INGREDIENT_CACHE_TTL = int(os.getenv('INGREDIENT_CACHE_TTL', 300))
+TAG_CACHE_TTL = int(os.getenv('TAG_CACHE_TTL', 300))
+
+USER_RELATIONS_CACHE = os.getenv('USER_RELATIONS_CACHE')
+USER_RELATIONS_CACHE_TIMEOUT = 60 * 60
+
+RESPONSE_CACHE_ALIAS = 'default'
+RESPONSE_CACHE_TIMEOUT = 60
+
+RECIPES_COUNT_CACHE_TIMEOUT = 30
+RECIPES_COUNT_ESTIMATE_THRESHOLD = 10000
+
+RECIPE_IMAGE_FORMAT = os.getenv('RECIPE_IMAGE_FORMAT', 'WEBP')
+RECIPE_IMAGE_QUALITY = 80
+RECIPE_IMAGE_SIZES = {
+    'image': (1280, 1280),
+    'image_list': (600, 600),
+    'image_short': (200, 200),
+}
+
+RECIPE_IMAGE_MAX_SIZE = int(
+    os.getenv('RECIPE_IMAGE_MAX_SIZE', 10 * 1024 * 1024)
+)
+RECIPE_IMAGE_CONTENT_TYPES = (
+    'image/png', 'image/jpeg', 'image/gif', 'image/webp',
+)
+RECIPE_IMAGE_PLACEHOLDER = 'recipes/placeholder.svg'
+
+IMAGE_TASK_BACKEND = os.getenv('IMAGE_TASK_BACKEND', 'process')
+IMAGE_TASK_WORKERS = int(os.getenv('IMAGE_TASK_WORKERS', 2))
+
+FEED_MATERIALIZE_THRESHOLD = int(
+    os.getenv('FEED_MATERIALIZE_THRESHOLD', 1000)
+)
@@ -1,6 +1,7 @@
 from django.contrib import admin
 
-from .models import (Favorite, Ingredient, IngredientAmount, Recipe,
+from .images import set_recipe_image
+from .models import (Favorite, ImageTask, Ingredient, IngredientAmount, Recipe,
                      ShoppingСart, Tag)
 
 
@@ -27,8 +28,14 @@ class RecipeAdmin(admin.ModelAdmin):
     inlines = [IngredientAmountInline]
     empty_value_display = '-пусто-'
 
+    def save_model(self, request, obj, form, change):
+        if 'image' in form.changed_data and obj.image:
+            set_recipe_image(obj, obj.image)
+        super().save_model(request, obj, form, change)
+
+    @admin.display(description='В избранном', ordering='favorites_count')
     def count_favorites(self, obj):
-        return obj.favorite_recipe.count()
+        return obj.favorites_count
 
 
 class IngredientAdmin(admin.ModelAdmin):
@@ -48,8 +55,15 @@ class ShoppingСartAdmin(admin.ModelAdmin):
     search_fields = ('user__username', 'recipe__name',)
 
 
+class ImageTaskAdmin(admin.ModelAdmin):
+    list_display = ('pk', 'recipe', 'status', 'created')
+    list_filter = ('status',)
+    search_fields = ('recipe__name',)
+
+
 admin.site.register(Tag, TagAdmin)
 admin.site.register(Recipe, RecipeAdmin)
 admin.site.register(Ingredient, IngredientAdmin)
 admin.site.register(Favorite, FavoriteAdmin)
 admin.site.register(ShoppingСart, ShoppingСartAdmin)
+admin.site.register(ImageTask, ImageTaskAdmin)
@@ -0,0 +1,26 @@
+"""Пересчёт счётчиков избранного и списков покупок в рецептах."""
+from django.db.models import Count, OuterRef, Subquery
+from django.db.models.functions import Coalesce
+
+
+def count_subquery(model):
+    return Coalesce(Subquery(
+        model.objects.filter(
+            recipe=OuterRef('pk')
+        ).order_by().values('recipe').annotate(
+            count=Count('pk')
+        ).values('count')
+    ), 0)
+
+
+def recount_counters(recipes, favorite_model, cart_model):
+    """
+    Пересчитывает счётчики рецептов по таблицам избранного и покупок.
+
+    Модели передаются явно, чтобы функцию можно было вызвать
+    из миграции с историческими моделями.
+    """
+    return recipes.update(
+        favorites_count=count_subquery(favorite_model),
+        carts_count=count_subquery(cart_model),
+    )
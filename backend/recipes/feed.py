@@ -0,0 +1,94 @@
+"""
+Материализованная лента подписок.
+
+Для большинства пользователей лента собирается при чтении через
+EXISTS по подпискам. Когда у пользователя подписок не меньше
+FEED_MATERIALIZE_THRESHOLD, такой запрос становится дорогим, и его
+лента хранится в FeedEntry: записи добавляются при публикации рецепта
+и при подписке, удаляются при отписке.
+"""
+from django.conf import settings
+from django.db.models import Count
+
+from recipes.models import FeedEntry, Recipe
+from users.models import Subscription
+
+BATCH_SIZE = 1000
+
+
+def is_heavy(subscriptions_count):
+    threshold = settings.FEED_MATERIALIZE_THRESHOLD
+    return bool(threshold) and subscriptions_count >= threshold
+
+
+def is_materialized(user):
+    return is_heavy(Subscription.objects.filter(user=user).count())
+
+
+def heavy_followers(author_id):
+    """
+    id подписчиков автора с материализованной лентой.
+
+    Подписки считаются только у подписчиков этого автора, а не
+    группировкой по всей таблице Subscription.
+    """
+    followers = Subscription.objects.filter(
+        author_id=author_id
+    ).values('user_id')
+    return Subscription.objects.filter(
+        user_id__in=followers
+    ).order_by().values('user_id').annotate(
+        count=Count('pk')
+    ).filter(
+        count__gte=settings.FEED_MATERIALIZE_THRESHOLD
+    ).values_list('user_id', flat=True)
+
+
+def fill_feed(user_id, author_id=None):
+    """Добавляет в ленту рецепты всех авторов подписок или одного автора."""
+    recipes = Recipe.objects.filter(author__following__user_id=user_id)
+    if author_id is not None:
+        recipes = Recipe.objects.filter(author_id=author_id)
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe_id)
+         for recipe_id in recipes.values_list('id', flat=True).iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def clear_feed(user_id, author_id=None):
+    entries = FeedEntry.objects.filter(user_id=user_id)
+    if author_id is not None:
+        entries = entries.filter(recipe__author_id=author_id)
+    entries.delete()
+
+
+def publish_recipe(recipe):
+    """Раскладывает новый рецепт по материализованным лентам."""
+    if not settings.FEED_MATERIALIZE_THRESHOLD:
+        return
+    FeedEntry.objects.bulk_create(
+        (FeedEntry(user_id=user_id, recipe_id=recipe.id)
+         for user_id in heavy_followers(recipe.author_id).iterator()),
+        batch_size=BATCH_SIZE,
+        ignore_conflicts=True,
+    )
+
+
+def subscribe(subscription):
+    count = Subscription.objects.filter(user_id=subscription.user_id).count()
+    if not is_heavy(count):
+        return
+    if is_heavy(count - 1):
+        fill_feed(subscription.user_id, subscription.author_id)
+    else:
+        fill_feed(subscription.user_id)
+
+
+def unsubscribe(subscription):
+    count = Subscription.objects.filter(user_id=subscription.user_id).count()
+    if is_heavy(count):
+        clear_feed(subscription.user_id, subscription.author_id)
+    elif is_heavy(count + 1):
+        clear_feed(subscription.user_id)
@@ -0,0 +1,88 @@
+"""
+Обработка загруженных картинок рецептов.
+
+Картинка декодируется один раз, поворачивается по EXIF и без
+метаданных пересохраняется в RECIPE_IMAGE_FORMAT в нескольких
+размерах: основная картинка и миниатюры для списков и коротких
+карточек (см. RECIPE_IMAGE_SIZES).
+"""
+import os
+from io import BytesIO
+
+from django.conf import settings
+from django.core.files.base import ContentFile
+from PIL import Image, ImageOps, features
+
+EXTENSIONS = {'WEBP': 'webp', 'JPEG': 'jpg'}
+SAVE_OPTIONS = {
+    'WEBP': {'method': 4},
+    'JPEG': {'optimize': True, 'progressive': True},
+}
+
+
+def get_format():
+    image_format = settings.RECIPE_IMAGE_FORMAT
+    if image_format == 'WEBP' and not features.check('webp'):
+        return 'JPEG'
+    return image_format
+
+
+def prepare(image, image_format):
+    """Поворачивает картинку по EXIF и приводит к RGB или RGBA."""
+    image = ImageOps.exif_transpose(image)
+    has_alpha = image.mode in ('RGBA', 'LA') or (
+        image.mode == 'P' and 'transparency' in image.info
+    )
+    if not has_alpha:
+        image = image.convert('RGB')
+    elif image_format == 'WEBP':
+        image = image.convert('RGBA')
+    else:
+        rgba = image.convert('RGBA')
+        image = Image.new('RGB', rgba.size, 'white')
+        image.paste(rgba, mask=rgba.getchannel('A'))
+    image.info = {}
+    return image
+
+
+def encode(image, size, image_format):
+    variant = image.copy()
+    variant.thumbnail(size, Image.LANCZOS)
+    buffer = BytesIO()
+    variant.save(
+        buffer,
+        image_format,
+        quality=settings.RECIPE_IMAGE_QUALITY,
+        **SAVE_OPTIONS.get(image_format, {}),
+    )
+    return buffer.getvalue()
+
+
+def process_image(upload):
+    """
+    Возвращает словарь поле модели -> файл для всех размеров картинки.
+
+    Для JPEG декодер сразу уменьшает картинку до ближайшего
+    подходящего масштаба (draft), поэтому большие фотографии
+    не распаковываются целиком.
+    """
+    image_format = get_format()
+    extension = EXTENSIONS.get(image_format, image_format.lower())
+    stem = os.path.splitext(os.path.basename(upload.name))[0]
+    largest = max(max(size) for size in settings.RECIPE_IMAGE_SIZES.values())
+    upload.seek(0)
+    with Image.open(upload) as source:
+        source.draft('RGB', (largest, largest))
+        image = prepare(source, image_format)
+    variants = {}
+    for field, size in settings.RECIPE_IMAGE_SIZES.items():
+        variants[field] = ContentFile(
+            encode(image, size, image_format), name=f'{stem}.{extension}'
+        )
+    return variants
+
+
+def set_recipe_image(recipe, upload):
+    """Заменяет картинку рецепта и все её миниатюры."""
+    for field, content in process_image(upload).items():
+        setattr(recipe, field, content)
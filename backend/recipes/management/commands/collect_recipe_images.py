@@ -0,0 +1,78 @@
+import posixpath
+from datetime import timedelta
+from itertools import islice
+
+from django.core.management.base import BaseCommand
+from django.utils import timezone
+
+from recipes.models import ImageTask, Recipe
+from recipes.storage import (IMAGE_FIELDS, get_referenced, image_storage,
+                             release_images)
+
+
+def get_roots():
+    """Каталоги полей картинок без вложенных друг в друга."""
+    roots = {
+        Recipe._meta.get_field(field).upload_to.strip('/')
+        for field in IMAGE_FIELDS
+    }
+    return sorted(
+        root for root in roots
+        if not any(root.startswith(f'{other}/') for other in roots)
+    )
+
+
+def walk(directory, skip):
+    directories, files = image_storage.listdir(directory)
+    for filename in files:
+        yield posixpath.join(directory, filename)
+    for name in directories:
+        path = posixpath.join(directory, name)
+        if path not in skip:
+            yield from walk(path, skip)
+
+
+class Command(BaseCommand):
+    help = 'Delete recipe image files not referenced by any recipe'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batch-size', type=int, default=1000,
+            help='Сколько файлов проверять одним запросом',
+        )
+        parser.add_argument(
+            '--min-age', type=int, default=60,
+            help='Не трогать файлы моложе стольких минут',
+        )
+        parser.add_argument(
+            '--dry-run', action='store_true',
+            help='Только показать, что будет удалено',
+        )
+
+    def handle(self, *args, **options):
+        skip = {ImageTask._meta.get_field('source').upload_to.strip('/')}
+        cutoff = timezone.now() - timedelta(minutes=options['min_age'])
+        files = (
+            name
+            for root in get_roots() if image_storage.exists(root)
+            for name in walk(root, skip)
+            if image_storage.get_modified_time(name) < cutoff
+        )
+        checked = deleted = 0
+        while True:
+            batch = list(islice(files, options['batch_size']))
+            if not batch:
+                break
+            checked += len(batch)
+            if options['dry_run']:
+                orphans = set(batch) - get_referenced(batch)
+            else:
+                orphans = release_images(batch)
+            if options['verbosity'] > 1:
+                for name in sorted(orphans):
+                    self.stdout.write(name)
+            deleted += len(orphans)
+        action = 'Найдено' if options['dry_run'] else 'Удалено'
+        self.stdout.write(self.style.SUCCESS(
+            f'Проверено файлов: {checked}. {action} лишних: {deleted}'
+        ))
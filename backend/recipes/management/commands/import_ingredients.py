@@ -1,31 +1,117 @@
+import json
 import os
 from csv import reader
+from itertools import islice
+from time import perf_counter
 
 from django.conf import settings
 from django.core.management.base import BaseCommand, CommandError
+from django.db import transaction
 
 from recipes.models import Ingredient
+from recipes.signals import ingredients_imported
 
 DATA_ROOT = os.path.join(settings.BASE_DIR, 'data')
+READ_SIZE = 64 * 1024
+
+
+def read_csv(file):
+    for row in reader(file):
+        if row:
+            name, measurement_unit = row
+            yield name.strip(), measurement_unit.strip()
+
+
+def read_json(file):
+    """Читает массив объектов JSON по частям, не загружая файл целиком."""
+    decoder = json.JSONDecoder()
+    buffer = file.read(READ_SIZE).lstrip().lstrip('[')
+    while True:
+        buffer = buffer.lstrip().lstrip(',').lstrip()
+        if buffer.startswith(']'):
+            return
+        try:
+            item, end = decoder.raw_decode(buffer)
+        except json.JSONDecodeError:
+            chunk = file.read(READ_SIZE)
+            if not chunk:
+                raise
+            buffer += chunk
+            continue
+        yield item['name'].strip(), item['measurement_unit'].strip()
+        buffer = buffer[end:]
+
+
+READERS = {
+    '.csv': read_csv,
+    '.json': read_json,
+}
+
+
+def chunked(iterable, size):
+    iterator = iter(iterable)
+    chunk = list(islice(iterator, size))
+    while chunk:
+        yield chunk
+        chunk = list(islice(iterator, size))
 
 
 class Command(BaseCommand):
-    help = 'Load ingredients from csv file to database'
+    help = 'Load ingredients from csv or json file to database'
 
     def add_arguments(self, parser):
         parser.add_argument('filename', default='ingredients.csv', nargs='?',
                             type=str)
+        parser.add_argument('--batch-size', default=1000, type=int,
+                            help='Number of rows inserted per query')
+        parser.add_argument('--dry-run', action='store_true',
+                            help='Count new rows without writing them')
 
     def handle(self, *args, **options):
+        filename = options['filename']
+        read = READERS.get(os.path.splitext(filename)[1].lower())
+        if read is None:
+            raise CommandError('Поддерживаются только файлы csv и json')
+        start = perf_counter()
+        seen = set(
+            Ingredient.objects.values_list('name', 'measurement_unit')
+        )
+        total = created = 0
         try:
-            with open(os.path.join(DATA_ROOT, options['filename']), 'r',
-                      encoding='utf-8') as file_csv:
-                data = reader(file_csv)
-                for name, measurement_unit in data:
-                    Ingredient.objects.get_or_create(
-                        name=name,
-                        measurement_unit=measurement_unit
+            with open(os.path.join(DATA_ROOT, filename), 'r',
+                      encoding='utf-8') as file, transaction.atomic():
+                for chunk in chunked(read(file), options['batch_size']):
+                    total += len(chunk)
+                    new = []
+                    for row in chunk:
+                        if row not in seen:
+                            seen.add(row)
+                            new.append(row)
+                    created += len(new)
+                    if new and not options['dry_run']:
+                        Ingredient.objects.bulk_create(
+                            (
+                                Ingredient(
+                                    name=name,
+                                    measurement_unit=measurement_unit
+                                )
+                                for name, measurement_unit in new
+                            ),
+                            ignore_conflicts=True,
+                        )
+                    self.stdout.write(
+                        f'Обработано строк: {total}, новых: {created}'
                     )
         except FileNotFoundError:
             msg = 'Добавьте файл c данными в директорию data'
             raise CommandError(msg)
+        except (ValueError, KeyError) as error:
+            raise CommandError(f'Некорректные данные в файле: {error}')
+        if created and not options['dry_run']:
+            ingredients_imported.send(sender=Ingredient, created=created)
+        elapsed = perf_counter() - start
+        action = 'Будет добавлено' if options['dry_run'] else 'Добавлено'
+        self.stdout.write(self.style.SUCCESS(
+            f'{action} {created} из {total} ингредиентов '
+            f'за {elapsed:.2f} с ({total / max(elapsed, 1e-6):.0f} строк/с)'
+        ))
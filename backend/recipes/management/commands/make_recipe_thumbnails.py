@@ -0,0 +1,34 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+
+from recipes.images import set_recipe_image
+from recipes.models import Recipe
+from recipes.storage import IMAGE_FIELDS
+
+
+class Command(BaseCommand):
+    help = 'Recompress recipe images and create missing thumbnails'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--all', action='store_true',
+            help='Обработать и рецепты, у которых миниатюры уже есть',
+        )
+
+    def handle(self, *args, **options):
+        recipes = Recipe.objects.exclude(image='').exclude(image=None)
+        if not options['all']:
+            # У рецептов, созданных до появления миниатюр, поле NULL.
+            recipes = recipes.filter(
+                Q(image_short='') | Q(image_short__isnull=True)
+            )
+        processed = 0
+        for recipe in recipes.only('pk', *IMAGE_FIELDS).iterator():
+            with transaction.atomic(), recipe.image.open() as source:
+                set_recipe_image(recipe, source)
+                recipe.save(update_fields=IMAGE_FIELDS)
+            processed += 1
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработаны картинки {processed} рецептов'
+        ))
@@ -0,0 +1,38 @@
+from django.core.management.base import BaseCommand
+
+from recipes.models import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_PROCESSING,
+                            ImageTask)
+from recipes.tasks import run_image_task
+
+
+class Command(BaseCommand):
+    help = 'Process queued recipe images'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--retry-failed', action='store_true',
+            help='Вернуть в очередь задачи, завершившиеся ошибкой',
+        )
+        parser.add_argument(
+            '--requeue-processing', action='store_true',
+            help='Вернуть в очередь задачи, брошенные упавшими процессами',
+        )
+
+    def handle(self, *args, **options):
+        statuses = []
+        if options['retry_failed']:
+            statuses.append(IMAGE_FAILED)
+        if options['requeue_processing']:
+            statuses.append(IMAGE_PROCESSING)
+        if statuses:
+            ImageTask.objects.filter(status__in=statuses).update(
+                status=IMAGE_PENDING, error=''
+            )
+        task_ids = ImageTask.objects.filter(
+            status=IMAGE_PENDING
+        ).values_list('pk', flat=True)
+        processed = sum(run_image_task(task_id) for task_id in task_ids)
+        failed = ImageTask.objects.filter(status=IMAGE_FAILED).count()
+        self.stdout.write(self.style.SUCCESS(
+            f'Обработано задач: {processed}, с ошибкой: {failed}'
+        ))
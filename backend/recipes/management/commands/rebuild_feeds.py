@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Count
+
+from recipes.feed import fill_feed
+from recipes.models import FeedEntry
+from users.models import Subscription
+
+
+class Command(BaseCommand):
+    help = 'Rebuild materialized subscription feeds'
+
+    @transaction.atomic
+    def handle(self, *args, **options):
+        FeedEntry.objects.all().delete()
+        threshold = settings.FEED_MATERIALIZE_THRESHOLD
+        user_ids = []
+        if threshold:
+            user_ids = Subscription.objects.order_by().values(
+                'user'
+            ).annotate(
+                count=Count('pk')
+            ).filter(count__gte=threshold).values_list('user', flat=True)
+        users = 0
+        for users, user_id in enumerate(user_ids, 1):
+            fill_feed(user_id)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересобраны ленты {users} пользователей'
+        ))
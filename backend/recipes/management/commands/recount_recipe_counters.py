@@ -0,0 +1,14 @@
+from django.core.management.base import BaseCommand
+
+from recipes.counters import recount_counters
+from recipes.models import Favorite, Recipe, ShoppingСart
+
+
+class Command(BaseCommand):
+    help = 'Recount favorites and shopping cart counters of recipes'
+
+    def handle(self, *args, **options):
+        updated = recount_counters(Recipe.objects, Favorite, ShoppingСart)
+        self.stdout.write(self.style.SUCCESS(
+            f'Пересчитаны счётчики {updated} рецептов'
+        ))
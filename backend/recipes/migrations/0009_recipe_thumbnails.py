@@ -0,0 +1,23 @@
+# Generated by Django 3.2 on 2026-10-18 06:48
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0008_feed_entry'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_list',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='recipes/list/', verbose_name='Миниатюра для списка'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_short',
+            field=models.ImageField(blank=True, editable=False, null=True, upload_to='recipes/short/', verbose_name='Миниатюра для карточки'),
+        ),
+    ]
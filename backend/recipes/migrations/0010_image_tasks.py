@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 06:48
+
+from django.db import migrations, models
+import django.db.models.deletion
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0009_recipe_thumbnails'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='recipe',
+            name='image_status',
+            field=models.CharField(choices=[('ready', 'Готова'), ('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('failed', 'Ошибка')], default='ready', editable=False, max_length=10, verbose_name='Обработка картинки'),
+        ),
+        migrations.AddField(
+            model_name='recipe',
+            name='image_upload',
+            field=models.BigIntegerField(blank=True, editable=False, null=True, verbose_name='Последняя загрузка картинки'),
+        ),
+        migrations.CreateModel(
+            name='ImageTask',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('source', models.FileField(upload_to='recipes/uploads/', verbose_name='Исходный файл')),
+                ('status', models.CharField(choices=[('ready', 'Готова'), ('pending', 'В очереди'), ('processing', 'Обрабатывается'), ('failed', 'Ошибка')], db_index=True, default='pending', max_length=10, verbose_name='Статус')),
+                ('error', models.TextField(blank=True, verbose_name='Ошибка')),
+                ('created', models.DateTimeField(auto_now_add=True, verbose_name='Создана')),
+                ('recipe', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='image_tasks', to='recipes.recipe', verbose_name='Рецепт')),
+            ],
+            options={
+                'verbose_name': 'Обработка картинки',
+                'verbose_name_plural': 'Обработка картинок',
+                'ordering': ('created',),
+            },
+        ),
+    ]
@@ -0,0 +1,40 @@
+# Generated by Django 3.2 on 2026-10-18 06:52
+
+from django.db import migrations, models
+import recipes.storage
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0010_image_tasks'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='StoredImage',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=255, unique=True, verbose_name='Файл')),
+            ],
+            options={
+                'verbose_name': 'Файл картинки',
+                'verbose_name_plural': 'Файлы картинок',
+            },
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image',
+            field=models.ImageField(blank=True, null=True, storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/', verbose_name='Картинка рецепта'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image_list',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/list/', verbose_name='Миниатюра для списка'),
+        ),
+        migrations.AlterField(
+            model_name='recipe',
+            name='image_short',
+            field=models.ImageField(blank=True, editable=False, null=True, storage=recipes.storage.ContentAddressedStorage(), upload_to='recipes/short/', verbose_name='Миниатюра для карточки'),
+        ),
+    ]
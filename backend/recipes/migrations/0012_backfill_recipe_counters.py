@@ -0,0 +1,23 @@
+from django.db import migrations
+
+from recipes.counters import recount_counters
+
+
+def backfill_counters(apps, schema_editor):
+    Recipe = apps.get_model('recipes', 'Recipe')
+    recount_counters(
+        Recipe.objects,
+        apps.get_model('recipes', 'Favorite'),
+        apps.get_model('recipes', 'ShoppingСart'),
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0011_image_storage'),
+    ]
+
+    operations = [
+        migrations.RunPython(backfill_counters, migrations.RunPython.noop),
+    ]
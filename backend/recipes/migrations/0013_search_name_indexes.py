@@ -0,0 +1,77 @@
+import logging
+
+from django.db import DatabaseError, migrations, transaction
+
+logger = logging.getLogger(__name__)
+
+SEARCH_TABLES = ('recipes_ingredient', 'recipes_recipe')
+
+# Django строит istartswith и icontains как UPPER(name::text) LIKE ...,
+# поэтому индексы функциональные. IF NOT EXISTS - для баз, где их уже
+# создал прежний обработчик post_migrate.
+PREFIX_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS {table}_name_upper_prefix_idx '
+    'ON {table} (UPPER(name::text) text_pattern_ops)'
+)
+TRIGRAM_INDEX_SQL = (
+    'CREATE INDEX IF NOT EXISTS {table}_name_upper_trgm_idx '
+    'ON {table} USING gin (UPPER(name::text) gin_trgm_ops)'
+)
+DROP_INDEX_SQL = 'DROP INDEX IF EXISTS {table}_name_upper_{kind}_idx'
+
+
+class PostgresRunSQL(migrations.RunSQL):
+    """RunSQL, который на других СУБД ничего не делает."""
+
+    def database_forwards(self, app_label, schema_editor, *args):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_forwards(app_label, schema_editor, *args)
+
+    def database_backwards(self, app_label, schema_editor, *args):
+        if schema_editor.connection.vendor == 'postgresql':
+            super().database_backwards(app_label, schema_editor, *args)
+
+
+def create_trigram_indexes(apps, schema_editor):
+    """
+    Индексы для icontains, если доступно расширение pg_trgm.
+
+    Роль без прав на CREATE EXTENSION или сборка PostgreSQL без contrib
+    не должны ломать migrate: тогда поиск подстроки остаётся без
+    индекса, а индексы можно создать повторным запуском миграции
+    после установки расширения.
+    """
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    try:
+        with transaction.atomic(using=schema_editor.connection.alias):
+            schema_editor.execute('CREATE EXTENSION IF NOT EXISTS pg_trgm')
+    except DatabaseError as error:
+        logger.warning('pg_trgm недоступно, индексы для поиска подстроки '
+                       'не созданы: %s', error)
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(TRIGRAM_INDEX_SQL.format(table=table))
+
+
+def drop_trigram_indexes(apps, schema_editor):
+    if schema_editor.connection.vendor != 'postgresql':
+        return
+    for table in SEARCH_TABLES:
+        schema_editor.execute(DROP_INDEX_SQL.format(table=table, kind='trgm'))
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('recipes', '0012_backfill_recipe_counters'),
+    ]
+
+    operations = [
+        PostgresRunSQL(
+            [PREFIX_INDEX_SQL.format(table=table) for table in SEARCH_TABLES],
+            [DROP_INDEX_SQL.format(table=table, kind='prefix')
+             for table in SEARCH_TABLES],
+        ),
+        migrations.RunPython(create_trigram_indexes, drop_trigram_indexes),
+    ]
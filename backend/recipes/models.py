@@ -1,11 +1,30 @@
 from colorfield.fields import ColorField
+from django.conf import settings
 from django.contrib.auth import get_user_model
 from django.core import validators
 from django.db import models
+from django.db.models import (BooleanField, Exists, F, OuterRef, Prefetch,
+                              Value, Window)
+from django.db.models.functions import RowNumber
+from django.templatetags.static import static
 from foodgram.settings import MAX_LENGTH_HEX, MAX_LENGTH_TEXT
 
+from recipes.storage import image_storage
+from users.models import Subscription
+
 User = get_user_model()
 
+IMAGE_READY = 'ready'
+IMAGE_PENDING = 'pending'
+IMAGE_PROCESSING = 'processing'
+IMAGE_FAILED = 'failed'
+IMAGE_STATUSES = (
+    (IMAGE_READY, 'Готова'),
+    (IMAGE_PENDING, 'В очереди'),
+    (IMAGE_PROCESSING, 'Обрабатывается'),
+    (IMAGE_FAILED, 'Ошибка'),
+)
+
 
 class Ingredient(models.Model):
     """Модель Ингридента."""
@@ -22,6 +41,10 @@ class Ingredient(models.Model):
         ordering = ('name',)
         verbose_name = 'Ингридиент'
         verbose_name_plural = 'Ингридиенты'
+        constraints = [
+            models.UniqueConstraint(fields=['name', 'measurement_unit'],
+                                    name='unique_ingredient_unit')
+        ]
 
     def __str__(self):
         """Возвращает название Ингридента"""
@@ -56,6 +79,89 @@ class Tag(models.Model):
         return self.name
 
 
+class RecipeQuerySet(models.QuerySet):
+    """Набор запросов для рецептов."""
+
+    def with_user_flags(self, user):
+        """
+        Аннотирует рецепты флагами для пользователя.
+
+        is_favorited, is_in_shopping_cart и author_is_subscribed
+        вычисляются в основном запросе через EXISTS, поэтому
+        сериализаторам не нужны отдельные запросы на каждый рецепт.
+        """
+        if user.is_anonymous:
+            false = Value(False, output_field=BooleanField())
+            return self.annotate(
+                is_favorited=false,
+                is_in_shopping_cart=false,
+                author_is_subscribed=false,
+            )
+        return self.annotate(
+            is_favorited=Exists(Favorite.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            is_in_shopping_cart=Exists(ShoppingСart.objects.filter(
+                user=user, recipe=OuterRef('pk'))),
+            author_is_subscribed=Exists(Subscription.objects.filter(
+                user=user, author=OuterRef('author'))),
+        )
+
+    def for_read(self, user):
+        """
+        Набор рецептов для чтения.
+
+        Автор подтягивается через JOIN, id тегов и ингредиенты
+        с количеством загружаются отдельными запросами на всю страницу
+        сразу.
+        """
+        return self.select_related('author').prefetch_related(
+            Prefetch('recipetag_set', queryset=RecipeTag.objects.all()),
+            Prefetch(
+                'ingredientamount_set',
+                queryset=IngredientAmount.objects.select_related(
+                    'ingredient'
+                ),
+            ),
+        ).with_user_flags(user)
+
+    def feed(self, user, materialized=False):
+        """
+        Рецепты авторов, на которых подписан пользователь.
+
+        Обычно лента собирается при чтении через EXISTS по подпискам.
+        Для пользователей с материализованной лентой (см. recipes.feed)
+        рецепты берутся из FeedEntry.
+        """
+        if materialized:
+            return self.filter(feed_entries__user=user)
+        return self.filter(Exists(Subscription.objects.filter(
+            user=user, author=OuterRef('author'))))
+
+    def latest_by_author(self, author_ids, limit):
+        """
+        Последние рецепты авторов, не больше limit на каждого.
+
+        Рецепты нумеруются ROW_NUMBER() в разрезе автора, и лишние
+        отсекаются в базе, поэтому хватает одного запроса на страницу.
+        """
+        if not author_ids:
+            return self.none()
+        queryset = self.filter(author_id__in=author_ids).annotate(
+            row_number=Window(
+                expression=RowNumber(),
+                partition_by=F('author_id'),
+                order_by=F('pub_date').desc(),
+            )
+        )
+        sql, params = queryset.query.sql_with_params()
+        return self.raw(
+            f'SELECT * FROM ({sql}) AS ranked '
+            'WHERE ranked.row_number <= %s '
+            'ORDER BY ranked.pub_date DESC',
+            (*params, limit),
+        )
+
+
 class Recipe(models.Model):
     """Модель Рецепта."""
     name = models.CharField(
@@ -70,6 +176,7 @@ class Recipe(models.Model):
     )
     tags = models.ManyToManyField(
         Tag,
+        through='RecipeTag',
         related_name='recipes',
         verbose_name='Тэги рецепта')
     ingredients = models.ManyToManyField(
@@ -85,10 +192,40 @@ class Recipe(models.Model):
     )
     image = models.ImageField(
         upload_to='recipes/',
+        storage=image_storage,
         null=True,
         blank=True,
         verbose_name='Картинка рецепта'
     )
+    image_list = models.ImageField(
+        upload_to='recipes/list/',
+        storage=image_storage,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Миниатюра для списка'
+    )
+    image_short = models.ImageField(
+        upload_to='recipes/short/',
+        storage=image_storage,
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Миниатюра для карточки'
+    )
+    image_status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUSES,
+        default=IMAGE_READY,
+        editable=False,
+        verbose_name='Обработка картинки',
+    )
+    image_upload = models.BigIntegerField(
+        null=True,
+        blank=True,
+        editable=False,
+        verbose_name='Последняя загрузка картинки',
+    )
     text = models.TextField(
         verbose_name='Описание рецепта',
     )
@@ -101,16 +238,83 @@ class Recipe(models.Model):
         ],
         verbose_name='Время приготовления (в минутах)',
     )
+    favorites_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В избранном',
+    )
+    carts_count = models.PositiveIntegerField(
+        default=0,
+        editable=False,
+        verbose_name='В списках покупок',
+    )
+
+    objects = RecipeQuerySet.as_manager()
 
     class Meta:
         ordering = ('-pub_date',)
         verbose_name = 'Рецепт'
         verbose_name_plural = 'Рецепты'
+        indexes = [
+            models.Index(fields=['-favorites_count', '-pub_date'],
+                         name='recipe_popular_idx'),
+            models.Index(fields=['-pub_date', '-id'],
+                         name='recipe_pub_date_id_idx'),
+            # Проверка ссылок на файл перед его удалением (storage).
+            models.Index(fields=['image'], name='recipe_image_idx'),
+            models.Index(fields=['image_list'], name='recipe_image_list_idx'),
+            models.Index(fields=['image_short'],
+                         name='recipe_image_short_idx'),
+        ]
 
     def __str__(self):
         """Возвращает название Рецепта."""
         return self.name
 
+    def get_image_url(self, field='image'):
+        """
+        URL картинки нужного размера.
+
+        Если миниатюры нет, отдаётся основная картинка, а пока картинка
+        нового рецепта обрабатывается - заглушка.
+        """
+        image = getattr(self, field) or self.image
+        if not image:
+            return static(settings.RECIPE_IMAGE_PLACEHOLDER)
+        return image.url
+
+
+class RecipeTag(models.Model):
+    """
+    Модель связи рецепта и тэга.
+
+    Описывает таблицу, которую раньше создавал ManyToManyField,
+    вместе с её уникальностью пары (recipe_id, tag_id).
+    """
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        verbose_name='Рецепт',
+    )
+    tag = models.ForeignKey(
+        Tag,
+        on_delete=models.CASCADE,
+        verbose_name='Тэг',
+    )
+
+    class Meta:
+        db_table = 'recipes_recipe_tags'
+        verbose_name = 'Тэг рецепта'
+        verbose_name_plural = 'Тэги рецептов'
+        indexes = [
+            models.Index(fields=['tag', 'recipe'],
+                         name='recipe_tag_tag_recipe_idx'),
+        ]
+
+    def __str__(self):
+        """Возвращает строку Рецепт - Тэг."""
+        return f'{self.recipe} - {self.tag}'
+
 
 class IngredientAmount(models.Model):
     """Модель количества ингридиентов в рецепте."""
@@ -206,3 +410,94 @@ class ShoppingСart(models.Model):
     def __str__(self):
         """Возвращает список покупок пользователя."""
         return f'{self.user} - {self.recipe}'
+
+
+class FeedEntry(models.Model):
+    """Запись материализованной ленты подписок пользователя."""
+    user = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Подписчик',
+    )
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='feed_entries',
+        verbose_name='Рецепт',
+    )
+
+    class Meta:
+        verbose_name = 'Запись ленты'
+        verbose_name_plural = 'Записи ленты'
+        constraints = [
+            models.UniqueConstraint(
+                fields=['user', 'recipe'],
+                name='unique_feed_entry'
+            )
+        ]
+
+    def __str__(self):
+        """Возвращает связь Подписчик - Рецепт."""
+        return f'{self.user} - {self.recipe}'
+
+
+class ImageTask(models.Model):
+    """Задача фоновой обработки загруженной картинки рецепта."""
+    recipe = models.ForeignKey(
+        Recipe,
+        on_delete=models.CASCADE,
+        related_name='image_tasks',
+        verbose_name='Рецепт',
+    )
+    source = models.FileField(
+        upload_to='recipes/uploads/',
+        verbose_name='Исходный файл',
+    )
+    status = models.CharField(
+        max_length=10,
+        choices=IMAGE_STATUSES,
+        default=IMAGE_PENDING,
+        db_index=True,
+        verbose_name='Статус',
+    )
+    error = models.TextField(
+        blank=True,
+        verbose_name='Ошибка',
+    )
+    created = models.DateTimeField(
+        auto_now_add=True,
+        verbose_name='Создана',
+    )
+
+    class Meta:
+        ordering = ('created',)
+        verbose_name = 'Обработка картинки'
+        verbose_name_plural = 'Обработка картинок'
+
+    def __str__(self):
+        """Возвращает рецепт и статус задачи."""
+        return f'{self.recipe} - {self.get_status_display()}'
+
+
+class StoredImage(models.Model):
+    """
+    Файл в хранилище картинок рецептов.
+
+    Строка блокируется на время записи файла и на время удаления,
+    поэтому файл не удаляется, пока его переиспользует незакоммиченная
+    транзакция (см. recipes.storage).
+    """
+    name = models.CharField(
+        max_length=255,
+        unique=True,
+        verbose_name='Файл',
+    )
+
+    class Meta:
+        verbose_name = 'Файл картинки'
+        verbose_name_plural = 'Файлы картинок'
+
+    def __str__(self):
+        """Возвращает имя файла."""
+        return self.name
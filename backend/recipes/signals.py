@@ -0,0 +1,85 @@
+from django.db import transaction
+from django.db.models import F
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import Signal, receiver
+
+from recipes import feed
+from recipes.models import Favorite, Recipe, ShoppingСart
+from recipes.storage import IMAGE_FIELDS, get_image_names, release_images
+from users.models import Subscription
+
+# Отправляется командой import_ingredients: bulk_create не вызывает
+# post_save, а импорт идёт в отдельном процессе.
+ingredients_imported = Signal()
+
+COUNTERS = {
+    Favorite: 'favorites_count',
+    ShoppingСart: 'carts_count',
+}
+
+
+def change_counter(sender, instance, delta):
+    field = COUNTERS[sender]
+    recipes = Recipe.objects.filter(pk=instance.recipe_id)
+    if delta < 0:
+        recipes = recipes.filter(**{f'{field}__gt': 0})
+    recipes.update(**{field: F(field) + delta})
+
+
+@receiver(post_save, sender=Favorite)
+@receiver(post_save, sender=ShoppingСart)
+def increment_counter(sender, instance, created, **kwargs):
+    if created:
+        change_counter(sender, instance, 1)
+
+
+@receiver(post_delete, sender=Favorite)
+@receiver(post_delete, sender=ShoppingСart)
+def decrement_counter(sender, instance, **kwargs):
+    change_counter(sender, instance, -1)
+
+
+@receiver(post_save, sender=Recipe)
+def publish_to_feeds(sender, instance, created, **kwargs):
+    if created:
+        feed.publish_recipe(instance)
+
+
+@receiver(post_save, sender=Subscription)
+def feed_on_subscribe(sender, instance, created, **kwargs):
+    if created:
+        feed.subscribe(instance)
+
+
+@receiver(post_delete, sender=Subscription)
+def feed_on_unsubscribe(sender, instance, **kwargs):
+    feed.unsubscribe(instance)
+
+
+def release_on_commit(names):
+    if names:
+        transaction.on_commit(lambda: release_images(names))
+
+
+@receiver(pre_save, sender=Recipe)
+def remember_images(sender, instance, update_fields=None, **kwargs):
+    if instance.pk is None or (
+        update_fields is not None
+        and not set(update_fields) & set(IMAGE_FIELDS)
+    ):
+        return
+    stored = Recipe.objects.filter(pk=instance.pk).values_list(
+        *IMAGE_FIELDS
+    ).first()
+    instance._stored_images = set(filter(None, stored or ()))
+
+
+@receiver(post_save, sender=Recipe)
+def release_replaced_images(sender, instance, **kwargs):
+    stored = instance.__dict__.pop('_stored_images', set())
+    release_on_commit(stored - get_image_names(instance))
+
+
+@receiver(post_delete, sender=Recipe)
+def release_deleted_images(sender, instance, **kwargs):
+    release_on_commit(get_image_names(instance))
@@ -0,0 +1,106 @@
+"""
+Хранилище картинок рецептов с адресацией по содержимому.
+
+Файл называется SHA-256 своего содержимого, поэтому одинаковые
+картинки хранятся один раз, а повторная загрузка не пишет на диск.
+Один файл может использоваться несколькими рецептами, поэтому при
+замене или удалении картинки файл удаляется, только когда на него
+больше не ссылается ни одно поле картинки ни одного рецепта.
+
+Запись и удаление файла идут под блокировкой его строки StoredImage,
+а ссылки перед удалением перепроверяются под той же блокировкой.
+Транзакция, переиспользовавшая файл, держит блокировку до коммита,
+поэтому удаление дождётся её и увидит новую ссылку.
+"""
+import os
+import posixpath
+from hashlib import sha256
+
+from django.core.files import File
+from django.core.files.storage import FileSystemStorage
+from django.db import transaction
+from django.db.models import Q
+from django.utils.deconstruct import deconstructible
+
+IMAGE_FIELDS = ('image', 'image_list', 'image_short')
+
+
+@deconstructible
+class ContentAddressedStorage(FileSystemStorage):
+    """Файловое хранилище, именующее файлы по хэшу содержимого."""
+
+    def get_hashed_name(self, name, content):
+        digest = sha256()
+        for chunk in content.chunks():
+            digest.update(chunk)
+        digest = digest.hexdigest()
+        directory, filename = posixpath.split(name)
+        extension = os.path.splitext(filename)[1].lower()
+        return posixpath.join(directory, digest[:2], digest + extension)
+
+    def save(self, name, content, max_length=None):
+        if name is None:
+            name = content.name
+        if not hasattr(content, 'chunks'):
+            content = File(content, name)
+        name = self.get_hashed_name(name, content)
+        with transaction.atomic():
+            lock_images([name])
+            if self.exists(name):
+                return name
+            return super().save(name, content, max_length)
+
+
+image_storage = ContentAddressedStorage()
+
+
+def get_image_names(recipe):
+    names = (getattr(recipe, field).name for field in IMAGE_FIELDS)
+    return {name for name in names if name}
+
+
+def lock_images(names):
+    """Блокирует строки StoredImage файлов до конца транзакции."""
+    from recipes.models import StoredImage
+
+    names = sorted(names)
+    StoredImage.objects.bulk_create(
+        (StoredImage(name=name) for name in names), ignore_conflicts=True
+    )
+    list(StoredImage.objects.select_for_update().filter(
+        name__in=names
+    ).order_by('name').values_list('pk', flat=True))
+
+
+def get_referenced(names):
+    """
+    Имена из names, на которые ссылается хотя бы один рецепт.
+
+    Каждое поле картинки проиндексировано, поэтому условие OR
+    выполняется по индексам, а не полным просмотром рецептов.
+    """
+    from recipes.models import Recipe
+
+    condition = Q()
+    for field in IMAGE_FIELDS:
+        condition |= Q(**{f'{field}__in': names})
+    referenced = set()
+    for row in Recipe.objects.filter(condition).values_list(*IMAGE_FIELDS):
+        referenced.update(row)
+    return referenced & set(names)
+
+
+def release_images(names):
+    """Удаляет файлы, на которые больше не ссылается ни один рецепт."""
+    from recipes.models import StoredImage
+
+    names = set(names)
+    if not names:
+        return set()
+    with transaction.atomic():
+        lock_images(names)
+        orphans = names - get_referenced(names)
+        StoredImage.objects.filter(name__in=orphans).delete()
+        for name in orphans:
+            image_storage.delete(name)
+    return orphans
@@ -0,0 +1,146 @@
+"""
+Фоновая обработка картинок рецептов.
+
+Исходный файл сохраняется в задачу ImageTask, и рецепт сразу
+отдаётся клиенту с заглушкой вместо новой картинки. Обработку
+выполняет бэкенд из IMAGE_TASK_BACKEND:
+
+- process - пул процессов (по умолчанию);
+- sync - сразу после коммита в том же процессе;
+- db - задачи только копятся в таблице и разбираются командой
+  process_image_tasks.
+
+Задачи хранятся в базе, поэтому то, что не успел обработать упавший
+процесс, дорабатывает та же команда.
+"""
+import logging
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from multiprocessing import get_context
+
+import django
+from django.conf import settings
+from django.db import transaction
+from django.db.models import Q
+
+from recipes.images import process_image
+from recipes.models import (IMAGE_FAILED, IMAGE_PENDING, IMAGE_PROCESSING,
+                            IMAGE_READY, ImageTask, Recipe)
+
+logger = logging.getLogger(__name__)
+
+
+def discard(task):
+    task.source.delete(save=False)
+    task.delete()
+
+
+def lock_current(task):
+    """
+    Блокирует рецепт, если задача - его последняя загрузка.
+
+    Возвращает None, если картинку уже заменили более новой загрузкой
+    или рецепт удалён. Вызывать внутри транзакции.
+    """
+    return Recipe.objects.select_for_update().filter(
+        pk=task.recipe_id, image_upload=task.pk
+    ).first()
+
+
+def run_image_task(task_id):
+    """
+    Обрабатывает картинку задачи и сохраняет её в рецепт.
+
+    Задача захватывается сменой статуса, поэтому её не обработают
+    дважды пул и команда одновременно. Результат записывается, только
+    если задача всё ещё последняя загрузка рецепта (Recipe.image_upload),
+    поэтому старая загрузка, обработанная позже новой, не затирает её.
+    Возвращает False, если задачу уже взял кто-то другой.
+    """
+    if not ImageTask.objects.filter(
+        pk=task_id, status=IMAGE_PENDING
+    ).update(status=IMAGE_PROCESSING):
+        return False
+    task = ImageTask.objects.get(pk=task_id)
+    try:
+        with task.source.open('rb') as source:
+            variants = process_image(source)
+    except Exception as error:
+        logger.exception('Не удалось обработать картинку задачи %s', task_id)
+        with transaction.atomic():
+            task.status, task.error = IMAGE_FAILED, str(error)
+            task.save(update_fields=('status', 'error'))
+            recipe = lock_current(task)
+            if recipe is not None:
+                recipe.image_status = IMAGE_FAILED
+                recipe.save(update_fields=('image_status',))
+        return True
+    with transaction.atomic():
+        recipe = lock_current(task)
+        if recipe is not None:
+            for field, content in variants.items():
+                setattr(recipe, field, content)
+            recipe.image_status = IMAGE_READY
+            recipe.save(update_fields=(*variants, 'image_status'))
+        discard(task)
+    return True
+
+
+def log_failure(future):
+    error = future.exception()
+    if error is not None:
+        logger.error('Ошибка фоновой обработки картинки: %r', error)
+
+
+class ImageTaskQueue:
+    """Очередь обработки картинок с ленивым пулом процессов."""
+
+    def __init__(self):
+        self._executor = None
+        self._lock = threading.Lock()
+
+    def get_executor(self):
+        executor = self._executor
+        if executor is None:
+            with self._lock:
+                executor = self._executor or ProcessPoolExecutor(
+                    max_workers=settings.IMAGE_TASK_WORKERS,
+                    mp_context=get_context('spawn'),
+                    initializer=django.setup,
+                )
+                self._executor = executor
+        return executor
+
+    def submit(self, task_id):
+        backend = settings.IMAGE_TASK_BACKEND
+        if backend == 'sync':
+            run_image_task(task_id)
+        elif backend == 'process':
+            try:
+                future = self.get_executor().submit(run_image_task, task_id)
+            except BrokenProcessPool:
+                logger.warning(
+                    'Пул обработки картинок недоступен, задача %s '
+                    'осталась в очереди', task_id
+                )
+                self._executor = None
+                return
+            future.add_done_callback(log_failure)
+
+    def enqueue(self, recipe, upload):
+        """Ставит загруженный файл в очередь после коммита транзакции."""
+        task = ImageTask.objects.create(recipe=recipe, source=upload)
+        upload.close()
+        if Recipe.objects.filter(
+            Q(image_upload__isnull=True) | Q(image_upload__lt=task.pk),
+            pk=recipe.pk,
+        ).update(image_status=IMAGE_PENDING, image_upload=task.pk):
+            recipe.image_status, recipe.image_upload = IMAGE_PENDING, task.pk
+        else:
+            recipe.refresh_from_db(fields=('image_status', 'image_upload'))
+        transaction.on_commit(lambda: self.submit(task.pk))
+        return task
+
+
+image_queue = ImageTaskQueue()
@@ -0,0 +1,42 @@
+from django.test import TestCase
+
+from recipes.counters import recount_counters
+from recipes.models import Favorite, Recipe, ShoppingСart
+from users.models import User
+
+
+class RecipeCountersTests(TestCase):
+
+    def setUp(self):
+        self.user = User.objects.create(
+            email='user@example.com', username='user'
+        )
+        self.recipe = Recipe.objects.create(
+            author=self.user, name='Суп', text='Варить', cooking_time=10
+        )
+
+    def test_counters_follow_favorites_and_carts(self):
+        favorite = Favorite.objects.create(user=self.user, recipe=self.recipe)
+        ShoppingСart.objects.create(user=self.user, recipe=self.recipe)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+        self.assertEqual(self.recipe.carts_count, 1)
+        favorite.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_decrement_of_stale_counter_stays_at_zero(self):
+        favorite = Favorite.objects.create(user=self.user, recipe=self.recipe)
+        Recipe.objects.update(favorites_count=0)
+        favorite.delete()
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 0)
+
+    def test_recount_restores_counters(self):
+        Favorite.objects.create(user=self.user, recipe=self.recipe)
+        ShoppingСart.objects.create(user=self.user, recipe=self.recipe)
+        Recipe.objects.update(favorites_count=0, carts_count=5)
+        recount_counters(Recipe.objects, Favorite, ShoppingСart)
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.favorites_count, 1)
+        self.assertEqual(self.recipe.carts_count, 1)
@@ -0,0 +1,45 @@
+from unittest import skipUnless
+
+from django.db import connection
+from django.test import TestCase
+
+from recipes.models import Ingredient, Recipe
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Индексы только в PostgreSQL')
+class SearchIndexTests(TestCase):
+
+    def setUp(self):
+        Ingredient.objects.bulk_create(
+            Ingredient(name=f'Продукт {number}', measurement_unit='г')
+            for number in range(1000)
+        )
+        Ingredient.objects.create(name='Соль', measurement_unit='г')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE recipes_ingredient')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+
+    def assert_uses_index(self, queryset, index):
+        self.assertIn(index, queryset.explain())
+
+    def test_istartswith_uses_prefix_index(self):
+        self.assert_uses_index(
+            Ingredient.objects.filter(name__istartswith='сол'),
+            'recipes_ingredient_name_upper_prefix_idx',
+        )
+        self.assert_uses_index(
+            Recipe.objects.filter(name__istartswith='суп'),
+            'recipes_recipe_name_upper_prefix_idx',
+        )
+
+    def test_icontains_uses_trigram_index(self):
+        with connection.cursor() as cursor:
+            cursor.execute(
+                "SELECT 1 FROM pg_extension WHERE extname = 'pg_trgm'"
+            )
+            if cursor.fetchone() is None:
+                self.skipTest('pg_trgm не установлено')
+        self.assert_uses_index(
+            Ingredient.objects.filter(name__icontains='оль'),
+            'recipes_ingredient_name_upper_trgm_idx',
+        )
@@ -0,0 +1,57 @@
+from io import StringIO
+from unittest import skipUnless
+
+from django.core.management import call_command
+from django.db import IntegrityError, connection, transaction
+from django.db.models import Exists, OuterRef
+from django.test import TestCase
+
+from recipes.models import Recipe, RecipeTag, Tag
+from users.models import User
+
+
+class MigrationStateTests(TestCase):
+
+    def test_models_match_migrations(self):
+        call_command(
+            'makemigrations', '--check', '--dry-run', stdout=StringIO()
+        )
+
+
+class RecipeTagTests(TestCase):
+
+    def setUp(self):
+        author = User.objects.create(
+            email='author@example.com', username='author'
+        )
+        self.recipe = Recipe.objects.create(
+            author=author, name='Суп', text='Варить', cooking_time=10
+        )
+        self.tags = [
+            Tag.objects.create(name=f'Тэг {i}', slug=f'tag-{i}',
+                               color='#000000')
+            for i in range(2)
+        ]
+
+    def test_setting_tags_twice_keeps_one_row_per_tag(self):
+        self.recipe.tags.set(self.tags)
+        self.recipe.tags.add(*self.tags)
+        self.recipe.tags.set(self.tags)
+        self.assertEqual(
+            RecipeTag.objects.filter(recipe=self.recipe).count(), 2
+        )
+
+    def test_database_rejects_duplicate_rows(self):
+        RecipeTag.objects.create(recipe=self.recipe, tag=self.tags[0])
+        with self.assertRaises(IntegrityError), transaction.atomic():
+            RecipeTag.objects.create(recipe=self.recipe, tag=self.tags[0])
+
+    @skipUnless(connection.vendor == 'postgresql', 'План PostgreSQL')
+    def test_tag_filter_uses_tag_recipe_index(self):
+        self.recipe.tags.set(self.tags)
+        with connection.cursor() as cursor:
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        plan = Recipe.objects.filter(Exists(RecipeTag.objects.filter(
+            recipe=OuterRef('pk'), tag_id__in=[self.tags[0].id]
+        ))).explain()
+        self.assertIn('recipe_tag_tag_recipe_idx', plan)
@@ -0,0 +1,98 @@
+import threading
+from unittest import skipUnless
+
+from django.core.files.base import ContentFile
+from django.db import connection, transaction
+from django.test import TestCase, TransactionTestCase
+from django.test.utils import CaptureQueriesContext
+
+from api.tests.base import TempMediaMixin
+from recipes.models import Recipe, StoredImage
+from recipes.storage import get_referenced, image_storage, release_images
+from users.models import User
+
+
+class StorageTestMixin(TempMediaMixin):
+
+    def create_recipe(self, **kwargs):
+        author, _ = User.objects.get_or_create(
+            email='author@example.com', username='author'
+        )
+        return Recipe.objects.create(
+            author=author, name='Суп', text='Варить', cooking_time=10,
+            **kwargs,
+        )
+
+
+class ContentAddressedStorageTests(StorageTestMixin, TestCase):
+
+    def test_same_content_is_stored_once(self):
+        first = image_storage.save('recipes/a.png', ContentFile(b'data'))
+        second = image_storage.save('recipes/b.png', ContentFile(b'data'))
+        self.assertEqual(first, second)
+        self.assertEqual(StoredImage.objects.filter(name=first).count(), 1)
+
+    def test_release_keeps_referenced_files(self):
+        name = image_storage.save('recipes/a.png', ContentFile(b'data'))
+        self.create_recipe(image=name)
+        self.assertEqual(release_images([name]), set())
+        self.assertTrue(image_storage.exists(name))
+
+    def test_release_deletes_orphans(self):
+        name = image_storage.save('recipes/a.png', ContentFile(b'data'))
+        self.assertEqual(release_images([name]), {name})
+        self.assertFalse(image_storage.exists(name))
+        self.assertFalse(StoredImage.objects.filter(name=name).exists())
+
+    def test_save_after_release_writes_file_again(self):
+        name = image_storage.save('recipes/a.png', ContentFile(b'data'))
+        release_images([name])
+        image_storage.save('recipes/b.png', ContentFile(b'data'))
+        self.assertTrue(image_storage.exists(name))
+
+
+@skipUnless(connection.vendor == 'postgresql', 'План PostgreSQL')
+class ReferenceIndexTests(StorageTestMixin, TestCase):
+
+    def test_reference_check_uses_image_indexes(self):
+        for i in range(100):
+            self.create_recipe(image=f'recipes/{i}.png',
+                               image_list=f'recipes/list/{i}.webp',
+                               image_short=f'recipes/short/{i}.webp')
+        with connection.cursor() as cursor:
+            cursor.execute('ANALYZE recipes_recipe')
+            cursor.execute('SET LOCAL enable_seqscan = off')
+        with CaptureQueriesContext(connection) as queries:
+            get_referenced(['recipes/1.png'])
+        with connection.cursor() as cursor:
+            cursor.execute(f'EXPLAIN {queries[0]["sql"]}')
+            plan = '\n'.join(row[0] for row in cursor.fetchall())
+        for index in ('recipe_image_idx', 'recipe_image_list_idx',
+                      'recipe_image_short_idx'):
+            self.assertIn(index, plan)
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Нужны блокировки строк')
+class ReleaseRaceTests(StorageTestMixin, TransactionTestCase):
+
+    def test_release_waits_for_reusing_transaction(self):
+        name = image_storage.save('recipes/a.png', ContentFile(b'data'))
+        recipe = self.create_recipe()
+        saved, released = threading.Event(), []
+
+        def release():
+            saved.wait()
+            released.append(release_images([name]))
+            connection.close()
+
+        thread = threading.Thread(target=release)
+        thread.start()
+        with transaction.atomic():
+            reused = image_storage.save('recipes/b.png', ContentFile(b'data'))
+            saved.set()
+            thread.join(0.5)
+            self.assertTrue(thread.is_alive())
+            Recipe.objects.filter(pk=recipe.pk).update(image=reused)
+        thread.join()
+        self.assertEqual(released, [set()])
+        self.assertTrue(image_storage.exists(name))
@@ -0,0 +1,134 @@
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from io import BytesIO, StringIO
+from multiprocessing import get_context
+from unittest import skipUnless
+from unittest.mock import patch
+
+from django.core.files.uploadedfile import SimpleUploadedFile
+from django.core.management import call_command
+from django.db import connection
+from django.test import TestCase, TransactionTestCase, override_settings
+from PIL import Image
+
+from api.tests.base import TempMediaMixin
+from recipes.models import (IMAGE_PENDING, IMAGE_PROCESSING, IMAGE_READY,
+                            ImageTask, Recipe)
+from recipes.tasks import ImageTaskQueue, image_queue, run_image_task
+from recipes.tests.worker import init_worker
+from users.models import User
+
+
+def make_upload(color):
+    buffer = BytesIO()
+    Image.new('RGB', (64, 64), color).save(buffer, 'PNG')
+    return SimpleUploadedFile('image.png', buffer.getvalue(), 'image/png')
+
+
+class ImmediateExecutor:
+    """Исполнитель, выполняющий задачу сразу в том же потоке."""
+
+    def submit(self, func, *args):
+        future = Future()
+        future.set_result(func(*args))
+        return future
+
+
+class ImageTaskMixin(TempMediaMixin):
+
+    def setUp(self):
+        author = User.objects.create(
+            email='author@example.com', username='author'
+        )
+        self.recipe = Recipe.objects.create(
+            author=author, name='Суп', text='Варить', cooking_time=10
+        )
+
+    def assert_ready(self):
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, IMAGE_READY)
+        self.assertTrue(self.recipe.image_short)
+        self.assertFalse(ImageTask.objects.exists())
+
+
+class ImageTaskTests(ImageTaskMixin, TestCase):
+
+    def test_enqueue_marks_recipe_pending(self):
+        task = image_queue.enqueue(self.recipe, make_upload('red'))
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image_status, IMAGE_PENDING)
+        self.assertEqual(self.recipe.image_upload, task.pk)
+
+    def test_older_upload_does_not_overwrite_newer(self):
+        old = image_queue.enqueue(self.recipe, make_upload('red'))
+        new = image_queue.enqueue(self.recipe, make_upload('blue'))
+        self.assertTrue(run_image_task(new.pk))
+        self.recipe.refresh_from_db()
+        image = self.recipe.image.name
+        self.assertTrue(run_image_task(old.pk))
+        self.recipe.refresh_from_db()
+        self.assertEqual(self.recipe.image.name, image)
+        self.assertEqual(self.recipe.image_status, IMAGE_READY)
+        self.assertEqual(self.recipe.image_upload, new.pk)
+
+    def test_task_is_claimed_once(self):
+        task = image_queue.enqueue(self.recipe, make_upload('red'))
+        self.assertTrue(run_image_task(task.pk))
+        self.assertFalse(run_image_task(task.pk))
+
+    @override_settings(IMAGE_TASK_BACKEND='sync')
+    def test_sync_backend_runs_after_commit(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            image_queue.enqueue(self.recipe, make_upload('red'))
+            self.assertEqual(ImageTask.objects.count(), 1)
+        self.assert_ready()
+
+    @override_settings(IMAGE_TASK_BACKEND='process')
+    def test_process_backend_submits_to_pool(self):
+        queue = ImageTaskQueue()
+        queue._executor = ImmediateExecutor()
+        with self.captureOnCommitCallbacks(execute=True):
+            queue.enqueue(self.recipe, make_upload('red'))
+        self.assert_ready()
+
+    @override_settings(IMAGE_TASK_BACKEND='process')
+    def test_broken_pool_leaves_task_queued(self):
+        queue = ImageTaskQueue()
+        with patch.object(queue, 'get_executor') as get_executor:
+            get_executor.return_value.submit.side_effect = BrokenProcessPool
+            with self.captureOnCommitCallbacks(execute=True):
+                task = queue.enqueue(self.recipe, make_upload('red'))
+        self.assertIsNone(queue._executor)
+        task.refresh_from_db()
+        self.assertEqual(task.status, IMAGE_PENDING)
+        call_command('process_image_tasks', stdout=StringIO())
+        self.assert_ready()
+
+    def test_requeue_processing(self):
+        task = image_queue.enqueue(self.recipe, make_upload('red'))
+        ImageTask.objects.filter(pk=task.pk).update(status=IMAGE_PROCESSING)
+        call_command('process_image_tasks', stdout=StringIO())
+        task.refresh_from_db()
+        self.assertEqual(task.status, IMAGE_PROCESSING)
+        stdout = StringIO()
+        call_command('process_image_tasks', '--requeue-processing',
+                     stdout=stdout)
+        self.assertIn('Обработано задач: 1', stdout.getvalue())
+        self.assert_ready()
+
+
+@skipUnless(connection.vendor == 'postgresql', 'Процессам нужна общая база')
+class ProcessPoolTests(ImageTaskMixin, TransactionTestCase):
+
+    @override_settings(IMAGE_TASK_BACKEND='process')
+    def test_process_backend_runs_in_another_process(self):
+        queue = ImageTaskQueue()
+        queue._executor = ProcessPoolExecutor(
+            max_workers=1,
+            mp_context=get_context('spawn'),
+            initializer=init_worker,
+            initargs=(connection.settings_dict['NAME'], self.media_root),
+        )
+        queue.enqueue(self.recipe, make_upload('red'))
+        queue._executor.shutdown(wait=True)
+        self.assert_ready()
@@ -0,0 +1,45 @@
+from io import BytesIO, StringIO
+
+from django.core.files.base import ContentFile
+from django.core.management import call_command
+from django.test import TestCase
+from PIL import Image
+
+from api.tests.base import TempMediaMixin
+from recipes.models import Recipe
+from recipes.storage import image_storage
+from users.models import User
+
+
+class MakeRecipeThumbnailsTests(TempMediaMixin, TestCase):
+
+    def setUp(self):
+        buffer = BytesIO()
+        Image.new('RGB', (64, 64), 'red').save(buffer, 'PNG')
+        image = image_storage.save(
+            'recipes/a.png', ContentFile(buffer.getvalue())
+        )
+        author = User.objects.create(
+            email='author@example.com', username='author'
+        )
+        self.recipe = Recipe.objects.create(
+            author=author, name='Суп', text='Варить', cooking_time=10,
+            image=image,
+        )
+
+    def make_thumbnails(self, *args):
+        call_command('make_recipe_thumbnails', *args, stdout=StringIO())
+        self.recipe.refresh_from_db()
+
+    def test_legacy_recipe_without_thumbnails(self):
+        Recipe.objects.update(image_list=None, image_short=None)
+        self.make_thumbnails()
+        self.assertTrue(self.recipe.image_list)
+        self.assertTrue(self.recipe.image_short)
+
+    def test_recipes_with_thumbnails_are_skipped(self):
+        Recipe.objects.update(image_list='list.webp', image_short='short.webp')
+        self.make_thumbnails()
+        self.assertEqual(self.recipe.image_short.name, 'short.webp')
+        self.make_thumbnails('--all')
+        self.assertNotEqual(self.recipe.image_short.name, 'short.webp')
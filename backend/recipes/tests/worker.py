@@ -0,0 +1,15 @@
+"""
+Настройка процесса пула в тестах.
+
+Отдельный модуль без импорта моделей: процесс, запущенный через
+spawn, импортирует его до django.setup().
+"""
+import django
+from django.conf import settings
+
+
+def init_worker(database, media_root):
+    """Настраивает процесс пула на тестовую базу и MEDIA_ROOT."""
+    django.setup()
+    settings.DATABASES['default']['NAME'] = database
+    settings.MEDIA_ROOT = media_root